@@ -22,6 +22,10 @@
 
 import argparse
 
+# The possible values for the < solver > of class Routefinder.
+SOLVERS = ['auto', 'dynamic', 'recursive', 'restarts', 'annealing', 'beam', 'genetic', \
+																		'portfolio']
+
 # This function gets the command line arguments. It exists mainly to keep the 
 # main file more tidy.
 def get_args():
@@ -42,11 +46,357 @@ def get_args():
 	parser.add_argument(keyword, short, type = str, \
 					default = './000_missions.txt', help = this + that + siht)
 
+	keyword = '--instance'
+	short = '-i'
+	this = 'Complete path to an instance file (see compile_instance.py). If '
+	that = 'given, the missions, coordinates and distances are taken from it '
+	siht = 'and --infile, --cache and --galaxy-index are not used.'
+	parser.add_argument(keyword, short, metavar = 'INSTANCE_FILE', type = str, \
+							default = None, help = this + that + siht)
+
+	keyword = '--cache'
+	this = 'Complete path to the file in which the coordinates fetched from '
+	that = 'EDSM are stored to not fetch them again on the next run. Default '
+	siht = 'is the current directory with "000_coordinates_cache.sqlite" as '
+	taht = 'filename.'
+	parser.add_argument(keyword, metavar = 'CACHE_FILE', type = str, \
+				default = './000_coordinates_cache.sqlite', \
+				help = this + that + siht + taht)
+
+	keyword = '--result-cache'
+	this = 'Complete path to the file in which the routes that were found are '
+	that = 'stored. The next run with the same missions starts with that route '
+	siht = '(or is done at once if it is the shortest one). Default is the '
+	taht = 'current directory with "000_result_cache.sqlite" as filename.'
+	parser.add_argument(keyword, metavar = 'RESULT_CACHE_FILE', type = str, \
+				default = './000_result_cache.sqlite', \
+				help = this + that + siht + taht)
+
+	keyword = '--no-cache'
+	this = 'Always fetch the coordinates from EDSM and search the route from '
+	that = 'scratch. Do not store either of them.'
+	parser.add_argument(keyword, action = 'store_true', help = this + that)
+
+	keyword = '--galaxy-index'
+	short = '-g'
+	this = 'Complete path to a galaxy index file (see build_galaxy_index.py). '
+	that = 'If given, the coordinates are looked up in it instead of fetching '
+	siht = 'them from EDSM.'
+	parser.add_argument(keyword, short, metavar = 'INDEX_FILE', type = str, \
+							default = None, help = this + that + siht)
+
+	keyword = '--workers'
+	short = '-w'
+	this = 'The number of processes the search for a route is split over. '
+	that = 'Default is 1.'
+	parser.add_argument(keyword, short, metavar = 'N', type = int, \
+											default = 1, help = this + that)
+
+	keyword = '--solver'
+	short = '-s'
+	this = 'The method used to find a route. "auto" calculates the exact '
+	that = 'solution if possible and a good enough one otherwise. "annealing" '
+	siht = 'uses simulated annealing which is better for MANY destinations. '
+	siht += '"beam" keeps just the best partial routes (see --beam-width). '
+	siht += '"genetic" uses a genetic algorithm (one population per process, '
+	siht += 'see --workers and --population). '
+	siht += '"portfolio" runs all methods at the same time in separate '
+	siht += 'processes until one of them finds the shortest route. '
+	taht = 'The others use just one of the methods "auto" chooses from. '
+	tish = 'Default is "auto".'
+	parser.add_argument(keyword, short, choices = SOLVERS, default = 'auto', \
+									help = this + that + siht + taht + tish)
+
+	keyword = '--beam-width'
+	this = 'The number of partial routes the solver "beam" keeps. More find '
+	that = 'better routes but need more time and memory. Default is 1000.'
+	parser.add_argument(keyword, metavar = 'N', type = int, \
+										default = 1000, help = this + that)
+
+	keyword = '--population'
+	this = 'The number of routes in the population of the solver "genetic" '
+	that = '(in each process). Default is 200.'
+	parser.add_argument(keyword, metavar = 'N', type = int, \
+										default = 200, help = this + that)
+
+	keyword = '--gap'
+	this = 'Stop the search as soon as the best route is at most this fraction '
+	that = '(e.g. 0.02 for 2 %%) longer than the shortest route can be. '
+	siht = 'Default is to search until the maximum time is used up.'
+	parser.add_argument(keyword, metavar = 'FRACTION', type = float, \
+							default = None, help = this + that + siht)
+
+	keyword = '--stats-out'
+	this = 'Complete path to a file some numbers about the run (how long each '
+	that = 'part took, how many nodes were searched, when better routes were '
+	siht = 'found etc.) are written to (as JSON).'
+	parser.add_argument(keyword, metavar = 'FILE', type = str, \
+							default = None, help = this + that + siht)
+
+	keyword = '--checkpoint'
+	this = 'Complete path to a file the state of the search is written to from '
+	that = 'time to time. If the program is stopped, the search can be '
+	siht = 'continued later with --resume.'
+	parser.add_argument(keyword, metavar = 'FILE', type = str, \
+							default = None, help = this + that + siht)
+
+	keyword = '--checkpoint-interval'
+	this = 'The time between writing the checkpoint file. Default is 60 seconds.'
+	parser.add_argument(keyword, metavar = 'seconds', type = float, \
+													default = 60, help = this)
+
+	keyword = '--resume'
+	this = 'Continue the search from the state in the checkpoint file (if it '
+	that = 'exists and belongs to the same missions).'
+	parser.add_argument(keyword, action = 'store_true', help = this + that)
+
+	args = parser.parse_args()
+
+	if args.resume and args.checkpoint is None:
+		parser.error('--resume needs --checkpoint.')
+
+	return args
+
+
+# This function gets the command line arguments for build_galaxy_index.py.
+def get_index_args():
+	parser = argparse.ArgumentParser()
+
+	keyword = 'dump_file'
+	this = 'Complete path to the dump of all systems from EDSM (usually '
+	that = 'called "systemsWithCoordinates.json.gz").'
+	parser.add_argument(keyword, type = str, help = this + that)
+
+	keyword = 'index_file'
+	this = 'Complete path to the galaxy index file that shall be built.'
+	parser.add_argument(keyword, type = str, help = this)
+
+	args = parser.parse_args()
+
+	return args
+
+
+# This function gets the command line arguments for compile_instance.py.
+def get_compile_args():
+	parser = argparse.ArgumentParser()
+
+	keyword = 'infile'
+	this = 'Complete path to the file with the mission data (like '
+	that = '"000_missions.txt").'
+	parser.add_argument(keyword, type = str, help = this + that)
+
+	keyword = 'instance_file'
+	this = 'Complete path to the instance file that shall be written.'
+	parser.add_argument(keyword, type = str, help = this)
+
+	keyword = '--cache'
+	this = 'Complete path to the file in which the coordinates fetched from '
+	that = 'EDSM are stored to not fetch them again on the next run. Default '
+	siht = 'is the current directory with "000_coordinates_cache.sqlite" as '
+	taht = 'filename.'
+	parser.add_argument(keyword, metavar = 'CACHE_FILE', type = str, \
+				default = './000_coordinates_cache.sqlite', \
+				help = this + that + siht + taht)
+
+	keyword = '--no-cache'
+	this = 'Always fetch the coordinates from EDSM. Do not store them.'
+	parser.add_argument(keyword, action = 'store_true', help = this)
+
+	keyword = '--galaxy-index'
+	short = '-g'
+	this = 'Complete path to a galaxy index file (see build_galaxy_index.py). '
+	that = 'If given, the coordinates are looked up in it instead of fetching '
+	siht = 'them from EDSM.'
+	parser.add_argument(keyword, short, metavar = 'INDEX_FILE', type = str, \
+							default = None, help = this + that + siht)
+
+	args = parser.parse_args()
+
+	return args
+
+
+# This function gets the command line arguments for benchmark.py.
+def get_benchmark_args():
+	parser = argparse.ArgumentParser()
+
+	keyword = '--seeds'
+	this = 'The number of different random instances per number of travelers. '
+	that = 'Default is 5.'
+	parser.add_argument(keyword, metavar = 'N', type = int, default = 5, \
+														help = this + that)
+
+	keyword = '--travelers'
+	this = 'The numbers of travelers of the instances, separated by commas. '
+	that = 'Default is "3,5,7".'
+	parser.add_argument(keyword, metavar = 'N,N,...', type = str, \
+										default = '3,5,7', help = this + that)
+
+	keyword = '--chain-lengths'
+	this = 'The minimum and maximum number of destinations per traveler. '
+	that = 'Default is "2-4".'
+	parser.add_argument(keyword, metavar = 'MIN-MAX', type = str, \
+										default = '2-4', help = this + that)
+
+	keyword = '--shared'
+	this = 'How many of the destinations are shared between the travelers. '
+	that = 'The number of different systems is (1 - SHARED) times the total '
+	siht = 'number of destinations. Default is 0.3.'
+	parser.add_argument(keyword, metavar = 'SHARED', type = float, \
+								default = 0.3, help = this + that + siht)
+
+	keyword = '--maximum-time'
+	short = '-mt'
+	this = 'The maximum time each solver is allowed to take per instance. '
+	that = 'Default is 10 seconds.'
+	parser.add_argument(keyword, short, metavar = 'seconds', type = float, \
+											default = 10, help = this + that)
+
+	keyword = '--solvers'
+	this = 'The solvers to benchmark, separated by commas. Default is all of '
+	that = 'them: "{}".'.format(','.join(SOLVERS))
+	parser.add_argument(keyword, metavar = 'SOLVER,...', type = str, \
+							default = ','.join(SOLVERS), help = this + that)
+
+	keyword = '--json-out'
+	this = 'Complete path to a file the results are written to (as JSON).'
+	parser.add_argument(keyword, metavar = 'FILE', type = str, \
+										default = None, help = this)
+
 	args = parser.parse_args()
 
 	return args
 
 
+# This function gets the command line arguments for batch_optimizer.py.
+def get_batch_args():
+	parser = argparse.ArgumentParser()
+
+	keyword = 'source'
+	this = 'A directory with mission files (all files ending with ".txt") OR '
+	that = 'a file with one mission set per line as JSON (with the keys "id", '
+	siht = '"origin" and "travelers"). "-" reads the latter from the standard '
+	taht = 'input. Instance files (".inst", see compile_instance.py) in the '
+	tish = 'directory are used as they are.'
+	parser.add_argument(keyword, type = str, help = this + that + siht + taht + tish)
+
+	keyword = '--maximum-time'
+	short = '-mt'
+	this = 'The maximum time the path finding process is allowed to take '
+	that = 'for EACH mission set. Default is 123 seconds.'
+	parser.add_argument(keyword, short, metavar = 'seconds', type = float, \
+											default = 123, help = this + that)
+
+	keyword = '--cache'
+	this = 'Complete path to the file in which the coordinates fetched from '
+	that = 'EDSM are stored to not fetch them again on the next run. Default '
+	siht = 'is the current directory with "000_coordinates_cache.sqlite" as '
+	taht = 'filename.'
+	parser.add_argument(keyword, metavar = 'CACHE_FILE', type = str, \
+				default = './000_coordinates_cache.sqlite', \
+				help = this + that + siht + taht)
+
+	keyword = '--no-cache'
+	this = 'Always fetch the coordinates from EDSM and do not store them.'
+	parser.add_argument(keyword, action = 'store_true', help = this)
+
+	keyword = '--galaxy-index'
+	short = '-g'
+	this = 'Complete path to a galaxy index file (see build_galaxy_index.py). '
+	that = 'If given, the coordinates are looked up in it instead of fetching '
+	siht = 'them from EDSM.'
+	parser.add_argument(keyword, short, metavar = 'INDEX_FILE', type = str, \
+							default = None, help = this + that + siht)
+
+	keyword = '--workers'
+	short = '-w'
+	this = 'The number of mission sets that are solved at the same time (each '
+	that = 'in its own process). Default is 1.'
+	parser.add_argument(keyword, short, metavar = 'N', type = int, \
+											default = 1, help = this + that)
+
+	keyword = '--solver'
+	short = '-s'
+	this = 'The method used to find a route (see visitor_mission_optimizer.py). '
+	that = 'Default is "auto".'
+	parser.add_argument(keyword, short, choices = SOLVERS, default = 'auto', \
+												help = this + that)
+
+	keyword = '--out'
+	short = '-o'
+	this = 'Complete path to a file the results are written to (one line of '
+	that = 'JSON per mission set). Default is the standard output.'
+	parser.add_argument(keyword, short, metavar = 'FILE', type = str, \
+										default = None, help = this + that)
+
+	args = parser.parse_args()
+
+	return args
+
+
+# This function gets the command line arguments for solver_daemon.py.
+def get_daemon_args():
+	parser = argparse.ArgumentParser()
+
+	keyword = '--host'
+	this = 'The address the daemon listens on. Default is "127.0.0.1" (just '
+	that = 'this computer).'
+	parser.add_argument(keyword, type = str, default = '127.0.0.1', \
+														help = this + that)
+
+	keyword = '--port'
+	short = '-p'
+	this = 'The port the daemon listens on. Default is 8642.'
+	parser.add_argument(keyword, short, type = int, default = 8642, help = this)
+
+	keyword = '--maximum-time'
+	short = '-mt'
+	this = 'The maximum time the path finding process is allowed to take '
+	that = 'for ONE request. Requests may ask for less. Default is 123 seconds.'
+	parser.add_argument(keyword, short, metavar = 'seconds', type = float, \
+											default = 123, help = this + that)
+
+	keyword = '--cache'
+	this = 'Complete path to the file in which the coordinates fetched from '
+	that = 'EDSM are stored to not fetch them again on the next run. Default '
+	siht = 'is the current directory with "000_coordinates_cache.sqlite" as '
+	taht = 'filename.'
+	parser.add_argument(keyword, metavar = 'CACHE_FILE', type = str, \
+				default = './000_coordinates_cache.sqlite', \
+				help = this + that + siht + taht)
+
+	keyword = '--no-cache'
+	this = 'Always fetch the coordinates from EDSM and do not store them.'
+	parser.add_argument(keyword, action = 'store_true', help = this)
+
+	keyword = '--galaxy-index'
+	short = '-g'
+	this = 'Complete path to a galaxy index file (see build_galaxy_index.py). '
+	that = 'If given, the coordinates are looked up in it instead of fetching '
+	siht = 'them from EDSM.'
+	parser.add_argument(keyword, short, metavar = 'INDEX_FILE', type = str, \
+							default = None, help = this + that + siht)
+
+	keyword = '--workers'
+	short = '-w'
+	this = 'The number of requests that are answered at the same time (each '
+	that = 'in its own process). Default is 1.'
+	parser.add_argument(keyword, short, metavar = 'N', type = int, \
+											default = 1, help = this + that)
+
+	keyword = '--solver'
+	short = '-s'
+	this = 'The method used to find a route for requests that do not ask for '
+	that = 'a specific one (see visitor_mission_optimizer.py). Default is "auto".'
+	parser.add_argument(keyword, short, choices = SOLVERS, default = 'auto', \
+												help = this + that)
+
+	args = parser.parse_args()
+
+	return args
+
+
+
+
 
 
 
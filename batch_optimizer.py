@@ -0,0 +1,100 @@
+#    "batch_optimizer" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This program finds routes for many sets of missions (e.g. of different
+# commanders or for a whole wing) in one go. It does the same as
+# visitor_mission_optimizer.py for each of them, but:
+# - The coordinates of ALL systems of ALL mission sets are looked up just
+#   once (see class_batch.py). Systems that are in several mission sets are
+#   thus fetched just once from EDSM.
+# - Several mission sets can be solved at the same time.
+# - The result for each mission set is written as one line of JSON as soon
+#   as it is found (in the order the mission sets are finished, NOT in the
+#   order they were read).
+#
+# All other output goes to the standard error. Thus, the results can be
+# piped directly into another program.
+
+
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+import json
+import sys
+
+import class_datagrabber as cd
+import class_batch as cb
+import additional_functions as ad
+
+
+# The SystemStore instance and the settings each worker process uses. See
+# _initialize_worker().
+_worker_store = None
+_worker_settings = None
+
+
+# This function is called once in each worker process.
+def _initialize_worker(store, maximum_allowed_time, solver):
+	global _worker_store, _worker_settings
+
+	_worker_store = store
+	_worker_settings = (maximum_allowed_time, solver)
+
+
+# This function solves < mission_set > in a worker process.
+def _solve_in_worker(mission_set):
+	return cb.solve(mission_set, _worker_store, *_worker_settings)
+
+
+if __name__ == '__main__':
+	args = ad.get_batch_args()
+
+	# The file in which the coordinates of the systems are stored to not
+	# fetch them again from EDSM on the next run. None if the user doesn't
+	# want that.
+	cache_file = None if args.no_cache else args.cache
+
+	mission_sets = list(cb.read_mission_sets(args.source))
+
+	# Fetch the coordinates of all systems of all mission sets.
+	try:
+		with redirect_stdout(sys.stderr):
+			store = cb.SystemStore(mission_sets, cache_file, galaxy_index = args.galaxy_index)
+	except cd.EDSMError as error:
+		print("\n" + str(error), file = sys.stderr)
+		exit(1)
+
+	out = sys.stdout if args.out is None else open(args.out, 'w')
+
+	if args.workers > 1:
+		pool = Pool(args.workers, initializer = _initialize_worker, \
+						initargs = (store, args.maximum_time, args.solver))
+		results = pool.imap_unordered(_solve_in_worker, mission_sets)
+	else:
+		pool = None
+		results = (cb.solve(x, store, args.maximum_time, args.solver) for x in mission_sets)
+
+	try:
+		for result in results:
+			out.write(json.dumps(result) + '\n')
+			out.flush()
+	finally:
+		if pool is not None:
+			pool.terminate()
+
+		if out is not sys.stdout:
+			out.close()
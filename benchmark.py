@@ -0,0 +1,161 @@
+#    "benchmark" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This program measures how well the different solvers of class Routefinder 
+# perform. It generates random (but reproducible) instances (see 
+# class_missiongenerator.py), runs each solver on each of them with the 
+# same maximum time and reports for each run:
+# - the wall time,
+# - the number of nodes (or steps) the solver went through,
+# - the time until the first route was found and
+# - how much longer the route is than the shortest possible route (the 
+#   "gap"). The shortest route is calculated by the dynamic programming 
+#   solver if this is possible for the instance.
+# 
+# It exists to catch changes that make the solvers slower and to find out 
+# which solver is best for which kind of missions.
+
+
+from contextlib import redirect_stdout
+from time import time
+import json
+import os
+
+import class_missiongenerator as cm
+import class_routefinder as cr
+import additional_functions as ad
+
+
+# This function runs < solver > on < datagrabber > and returns the results
+# as a dict. All the output of class Routefinder is suppressed.
+def run(datagrabber, solver, maximum_allowed_time):
+	with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+		start_time = time()
+		routefinder = cr.Routefinder(datagrabber, maximum_allowed_time, solver = solver)
+		wall_time = time() - start_time
+
+	result = {}
+	result['solver'] = solver
+	result['wall_time'] = wall_time
+	result['nodes'] = routefinder.nodes
+	result['first_solution_time'] = routefinder.first_record_time
+	result['length'] = routefinder.record_length
+
+	return result
+
+
+# This function returns the length of the shortest route for 
+# < datagrabber > or None if it can't be calculated (because the tables of 
+# the dynamic programming solver would need too much memory).
+def shortest_length(datagrabber):
+	# The same check as in _do_all() of class Routefinder.
+	with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+		routefinder = cr.Routefinder(datagrabber, float('inf'), solver = 'dynamic', \
+																solve = False)
+
+	if routefinder._size_of_dynamic_programming_table() > routefinder.maximum_table_size:
+		return None
+
+	# The maximum time is "infinite" since the exact value is needed.
+	result = run(datagrabber, 'dynamic', float('inf'))
+
+	return result['length']
+
+
+if __name__ == '__main__':
+	args = ad.get_benchmark_args()
+
+	numbers_of_travelers = [int(x) for x in args.travelers.split(',')]
+	chain_lengths = tuple(int(x) for x in args.chain_lengths.split('-'))
+	solvers = args.solvers.split(',')
+
+	this = "{:>9} {:>4} {:>5} {:>10} {:>9} {:>11} {:>9} {:>10} {:>7}"
+	print(this.format('travelers', 'seed', 'dest.', 'solver', 'time [s]', \
+						'nodes', 'first [s]', 'length', 'gap [%]'))
+
+	results = []
+	for number_of_travelers in numbers_of_travelers:
+		for seed in range(args.seeds):
+			# The average number of destinations times the fraction of them 
+			# that are NOT shared.
+			average_length = sum(chain_lengths) / 2.0
+			number_of_systems = max(2, int(round(number_of_travelers * \
+										average_length * (1 - args.shared))))
+
+			with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+				datagrabber = cm.MissionGenerator(seed, number_of_travelers, \
+												chain_lengths, number_of_systems)
+			optimum = shortest_length(datagrabber)
+
+			for solver in solvers:
+				result = run(datagrabber, solver, args.maximum_time)
+
+				result['travelers'] = number_of_travelers
+				result['seed'] = seed
+				result['destinations'] = len(datagrabber.system_names) - 1
+				result['optimum'] = optimum
+				result['gap'] = None
+				if optimum is not None and optimum > 0:
+					result['gap'] = 100 * (result['length'] / optimum - 1)
+
+				results.append(result)
+
+				gap = 'n/a' if result['gap'] is None else '{:.2f}'.format(result['gap'])
+				first = 'n/a' if result['first_solution_time'] is None \
+								else '{:.3f}'.format(result['first_solution_time'])
+				this = "{:>9} {:>4} {:>5} {:>10} {:>9.3f} {:>11} {:>9} {:>10.2f} {:>7}"
+				print(this.format(number_of_travelers, seed, result['destinations'], \
+						solver, result['wall_time'], result['nodes'], first, \
+						result['length'], gap))
+
+	# A short summary for each solver.
+	print("\n{:>10} {:>14} {:>14} {:>14}".format('solver', 'mean time [s]', \
+													'mean gap [%]', 'max gap [%]'))
+	for solver in solvers:
+		these = [x for x in results if x['solver'] == solver]
+		gaps = [x['gap'] for x in these if x['gap'] is not None]
+		mean_time = sum([x['wall_time'] for x in these]) / len(these)
+		mean_gap = '{:.2f}'.format(sum(gaps) / len(gaps)) if gaps else 'n/a'
+		max_gap = '{:.2f}'.format(max(gaps)) if gaps else 'n/a'
+		print("{:>10} {:>14.3f} {:>14} {:>14}".format(solver, mean_time, mean_gap, max_gap))
+
+	if args.json_out is not None:
+		with open(args.json_out, 'w') as f:
+			json.dump(results, f, indent = 1)
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
@@ -0,0 +1,64 @@
+#    "build_galaxy_index" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This program builds a galaxy index file from the dump of all systems EDSM 
+# provides (https://www.edsm.net/dump/systemsWithCoordinates.json.gz). 
+# With this file visitor_mission_optimizer.py can look up the coordinates of 
+# all systems without access to EDSM (see its option --galaxy-index).
+# 
+# See class_galaxyindex.py for details.
+
+
+from time import time
+
+import class_galaxyindex as cgi
+import additional_functions as ad
+
+if __name__ == '__main__':
+	args = ad.get_index_args()
+
+	start_time = time()
+	print("Building galaxy index from", args.dump_file, "...")
+
+	number_of_systems = cgi.build_index(args.dump_file, args.index_file)
+
+	this = "Done. {} systems written to {} ".format(number_of_systems, args.index_file)
+	that = "in {0:.0f} s.".format(time() - start_time)
+	print(this + that)
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
@@ -0,0 +1,371 @@
+#    "class_annealer" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that finds a good
+# route for (very) many destinations by simulated annealing.
+# Contrary to the recursive search in class Routefinder it does NOT go
+# through all possible routes. It starts with one route and changes it again
+# and again a little bit. Changes that make the route shorter are always
+# kept, changes that make it longer just sometimes (less and less often the
+# longer the search goes on). This way a good route is found very fast and
+# it is improved until the maximum allowed time is used up.
+
+
+from time import time
+from math import exp
+import random
+
+
+# The object that contains all methods that are necessary for the simulated
+# annealing. It is instantiated in class Routefinder.
+#
+# A route is represented as a list of "tasks". A task is one destination of
+# one traveler. Thus, the same system may appear several times, once for
+# each traveler that wants to go there. Since the distance of a system to
+# itself is zero this doesn't change the length of a route if these tasks
+# follow each other. The restriction that the destinations of a traveler
+# have to be visited in order simply means that the task for the k-th
+# destination of a traveler has to be before the one for the (k + 1)-th.
+class Annealer(object):
+	# < routefinder > is the class Routefinder instance that contains the
+	# missions and the distances and that stores the best route.
+	# < seed > is for the random number generator. If None, each run is
+	# different.
+	def __init__(self, routefinder, seed = None):
+		self.routefinder = routefinder
+		self.distance_table = routefinder.distance_table
+		self.random = random.Random(seed)
+		# The id of the system the route starts in (see class Routefinder).
+		self.start = routefinder.start
+
+		# < self.systems[task] > is the system id of < task > and ...
+		self.systems = []
+		# ... < self.travelers_of_task[task] > is the traveler it belongs to.
+		self.travelers_of_task = []
+		# < self.previous_task[task] > is the task for the previous destination
+		# of the same traveler (or -1 if there is none) and
+		# < self.next_task[task] > the task for the next destination (or -1).
+		self.previous_task = []
+		self.next_task = []
+		# < self.index_of_task[task] > is which destination (0 for the first,
+		# 1 for the second etc.) of its traveler < task > is.
+		self.index_of_task = []
+		# < self.first_tasks[i] > is the task for the first destination of
+		# traveler i. The tasks of a traveler are numbered consecutively.
+		self.first_tasks = []
+
+		for i, chain in enumerate(routefinder.chains):
+			self.first_tasks.append(len(self.systems))
+
+			for k, point in enumerate(chain):
+				task = len(self.systems)
+				self.systems.append(point)
+				self.travelers_of_task.append(i)
+				self.index_of_task.append(k)
+				self.previous_task.append(task - 1 if k > 0 else -1)
+				self.next_task.append(task + 1 if k < len(chain) - 1 else -1)
+
+		# The current route as a list of tasks (the start system and origin
+		# are NOT part of it) ...
+		self.route = []
+		# ... and where each task is in it.
+		self.position = [0] * len(self.systems)
+		# The length of the current route (incl. the ways from the start
+		# system and to origin).
+		self.length = 0.0
+
+
+	# This method does the actual simulated annealing until
+	# < maximum_allowed_time > (counted from < start_time >) is used up or
+	# the search is cancelled (see class Routefinder). The best route found
+	# is handed to the Routefinder instance.
+	def run(self, start_time, maximum_allowed_time):
+		routefinder = self.routefinder
+
+		if not self.systems:
+			routefinder._new_record([self.start], self.distance_table[self.start][0])
+			return
+
+		# The annealing starts from the best route so far (the one of
+		# _find_greedy_route() or the incumbent of class Routefinder).
+		path = [routefinder.ids[x] for x in routefinder.record_path[:-1]]
+		self._set_route(self._route_from_path(path))
+
+		best_route = list(self.route)
+		best_length = self.length
+		self._report(best_route)
+
+		number_of_tasks = len(self.route)
+		# One "epoch" is one cooling down from the start temperature to
+		# (almost) zero. Afterwards the search starts again from the best
+		# route with the start temperature (reheating). The start temperature
+		# is chosen such that making the route longer by an average jump is
+		# accepted with a probability of roughly 1/7 in the beginning. Lower
+		# start temperatures got stuck in bad routes during testing.
+		iterations_per_epoch = 2000 * number_of_tasks
+		start_temperature = 0.5 * self.length / (number_of_tasks + 1)
+		cooling = (1e-4) ** (1.0 / iterations_per_epoch)
+
+		temperature = start_temperature
+		iteration = 0
+
+		while True:
+			iteration += 1
+			self.routefinder.nodes += 1
+
+			# Checking the time is relatively expensive compared to one move.
+			if iteration % 256 == 0:
+				if (time() - start_time) > maximum_allowed_time or \
+								routefinder._stop_requested():
+					break
+
+			if iteration % iterations_per_epoch == 0:
+				# If several methods race each other, another process may 
+				# have found a better route (see class Routefinder).
+				shared = routefinder._shared_record()
+				if shared is not None and shared[1] < best_length - 1e-9:
+					self._set_route(self._route_from_path(shared[0]))
+					best_route = list(self.route)
+					best_length = self.length
+
+				self._set_route(best_route)
+				temperature = start_temperature
+
+			temperature *= cooling
+
+			move = self._propose_move()
+			if move is None:
+				continue
+
+			delta = move[-1]
+			if delta <= 0 or self.random.random() < exp(-delta / temperature):
+				self._apply_move(move)
+
+				# The length is just updated by the changes. To avoid that
+				# rounding errors add up it is re-calculated when a new best
+				# route is found.
+				if self.length < best_length - 1e-9:
+					self.length = self._length_of_route(self.route)
+					if self.length < best_length - 1e-9:
+						best_length = self.length
+						best_route = list(self.route)
+						self._report(best_route)
+
+
+	# This method returns the system id at position < i > of the current
+	# route. Before the first task is the start system and after the last
+	# one origin (id 0).
+	def _system_at(self, i):
+		if i < 0:
+			return self.start
+		if i >= len(self.route):
+			return 0
+
+		return self.systems[self.route[i]]
+
+
+	# This method randomly chooses one change of the current route.
+	# Returns None if the change would break the order of the destinations of
+	# any traveler. Otherwise a tuple that describes the change. Its last
+	# element is always how much longer the route would become.
+	# The change in length is calculated just from the few distances that
+	# change and not from the whole route.
+	def _propose_move(self):
+		number_of_tasks = len(self.route)
+		distance_table = self.distance_table
+		choice = self.random.random()
+
+		# Reverse the order of the tasks from position i to j (2-opt).
+		if choice < 0.3:
+			i = self.random.randrange(number_of_tasks)
+			j = self.random.randrange(number_of_tasks)
+			if i == j:
+				return None
+			if i > j:
+				i, j = j, i
+
+			# If two tasks of the same traveler are in this part of the route
+			# their order would be swapped.
+			for k in range(i, j + 1):
+				following = self.next_task[self.route[k]]
+				if following != -1 and self.position[following] <= j:
+					return None
+
+			a = self._system_at(i - 1)
+			b = self._system_at(j + 1)
+			first = self._system_at(i)
+			last = self._system_at(j)
+			delta = distance_table[a][last] + distance_table[first][b] \
+					- distance_table[a][first] - distance_table[last][b]
+
+			return ('reverse', i, j, delta)
+
+		# Move one task (relocate) or a short part of the route (or-opt) to a
+		# different position. The moved tasks are inserted after the task that
+		# is now at position < after > (-1 means at the very beginning).
+		segment_length = 1 if choice < 0.65 else self.random.randint(2, 3)
+		if segment_length > number_of_tasks:
+			return None
+
+		i = self.random.randrange(number_of_tasks - segment_length + 1)
+		j = i + segment_length - 1
+		after = self.random.randrange(-1, number_of_tasks)
+		if i - 1 <= after <= j:
+			return None
+
+		for k in range(i, j + 1):
+			task = self.route[k]
+			previous = self.previous_task[task]
+			following = self.next_task[task]
+
+			if previous != -1 and not (i <= self.position[previous] <= j) \
+											and self.position[previous] > after:
+				return None
+			if following != -1 and not (i <= self.position[following] <= j) \
+											and self.position[following] <= after:
+				return None
+
+		a = self._system_at(i - 1)
+		b = self._system_at(j + 1)
+		c = self._system_at(after)
+		e = self._system_at(after + 1)
+		first = self._system_at(i)
+		last = self._system_at(j)
+		delta = distance_table[a][b] - distance_table[a][first] - distance_table[last][b] \
+				+ distance_table[c][first] + distance_table[last][e] - distance_table[c][e]
+
+		return ('move', i, j, after, delta)
+
+
+	# This method applies a change returned by _propose_move().
+	def _apply_move(self, move):
+		if move[0] == 'reverse':
+			_, i, j, delta = move
+			self.route[i:j + 1] = self.route[i:j + 1][::-1]
+			changed_from, changed_to = i, j
+		else:
+			_, i, j, after, delta = move
+			segment = self.route[i:j + 1]
+			del self.route[i:j + 1]
+
+			if after > j:
+				insert_at = after - len(segment) + 1
+				changed_from, changed_to = i, after
+			else:
+				insert_at = after + 1
+				changed_from, changed_to = after + 1, j
+
+			self.route[insert_at:insert_at] = segment
+
+		for k in range(changed_from, changed_to + 1):
+			self.position[self.route[k]] = k
+
+		self.length += delta
+
+
+	# This method makes < route > (a list of tasks) the current route.
+	def _set_route(self, route):
+		self.route = list(route)
+		for k, task in enumerate(self.route):
+			self.position[task] = k
+		self.length = self._length_of_route(self.route)
+
+
+	# This method returns the length of < route > (a list of tasks) incl. the
+	# ways from the start system and to origin.
+	def _length_of_route(self, route):
+		length = 0.0
+		current = self.start
+
+		for task in route:
+			length += self.distance_table[current][self.systems[task]]
+			current = self.systems[task]
+
+		return length + self.distance_table[current][0]
+
+
+	# This method converts < path > (a list of system ids that starts with
+	# the start system, like in _find_best_route() of class Routefinder) into a list
+	# of tasks.
+	def _route_from_path(self, path):
+		progress = [0] * len(self.routefinder.chains)
+
+		route = []
+		for point in path[1:]:
+			for i, chain in enumerate(self.routefinder.chains):
+				if progress[i] < len(chain) and chain[progress[i]] == point:
+					route.append(self.first_tasks[i] + progress[i])
+					progress[i] += 1
+
+		return route
+
+
+	# The other way round: this method converts < route > (a list of tasks)
+	# into a list of system ids that starts with the start system. A task is skipped if
+	# its traveler already got there because it was visited for another
+	# traveler. Thus, the path can just be shorter than the route.
+	def _path_from_route(self, route):
+		chains = self.routefinder.chains
+		progress = [0] * len(chains)
+		path = [self.start]
+
+		for task in route:
+			traveler = self.travelers_of_task[task]
+			if progress[traveler] > self.index_of_task[task]:
+				continue
+
+			point = self.systems[task]
+			path.append(point)
+			for i, chain in enumerate(chains):
+				if progress[i] < len(chain) and chain[progress[i]] == point:
+					progress[i] += 1
+
+		return path
+
+
+	# This method hands < route > (a list of tasks) as a new best route to the
+	# Routefinder instance.
+	def _report(self, route):
+		path = self._path_from_route(route)
+		length = 0.0
+		for first, second in zip(path, path[1:] + [0]):
+			length += self.distance_table[first][second]
+
+		self.routefinder._new_record(path, length)
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
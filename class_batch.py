@@ -0,0 +1,310 @@
+#    "class_batch" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definitions for the objects that are needed
+# to find routes for many sets of missions (e.g. of different commanders) in
+# one go (see batch_optimizer.py).
+# The coordinates of ALL systems of ALL mission sets are looked up just once
+# (in class SystemStore). Each mission set (class MissionSet) then just takes
+# the coordinates it needs from there.
+#
+# A mission set is a dict with the keys 'id' (anything to recognize it),
+# 'origin' (the name of the origin) and 'travelers' (a list that contains
+# lists that contain the destinations for each traveler in the correct
+# order, like < travelers > of class DataGrabber). Instead of the latter two
+# it may have the key 'instance' with the complete path to an instance file
+# (see class_instancefile.py). Its systems are NOT looked up again.
+# A mission set that is broken (see check_mission_set()) or that contains a 
+# system whose coordinates can't be found doesn't stop the others. Its 
+# result just contains the error.
+
+
+from contextlib import redirect_stdout
+import json
+import sys
+import os
+import numpy as np
+
+import class_datagrabber as cd
+import class_instancefile as cif
+import class_routefinder as cr
+
+
+# This function reads mission sets from < source >. This is either a
+# directory in which each .txt-file is a mission file (like
+# "000_missions.txt") and each .inst-file an instance file or a file with 
+# one mission set as JSON per line (or '-' for the standard input). Returns 
+# a generator of mission sets. A line that isn't a JSON object gives a 
+# mission set with the key 'error' (see check_mission_set()).
+def read_mission_sets(source):
+	if os.path.isdir(source):
+		for filename in sorted(os.listdir(source)):
+			if filename.endswith('.inst'):
+				yield {'id': filename, 'instance': os.path.join(source, filename)}
+				continue
+
+			if not filename.endswith('.txt'):
+				continue
+
+			try:
+				origin, travelers = cd.read_missions(os.path.join(source, filename))
+			except (IndexError, OSError, UnicodeDecodeError) as error:
+				this = 'The mission file could not be read '
+				that = '({}: {}).'.format(type(error).__name__, error)
+				yield {'id': filename, 'error': this + that}
+				continue
+
+			yield {'id': filename, 'origin': origin, 'travelers': travelers}
+
+		return
+
+	f = sys.stdin if source == '-' else open(source, 'r')
+	try:
+		for i, line in enumerate(f):
+			if not line.strip():
+				continue
+
+			try:
+				mission_set = json.loads(line)
+			except ValueError as error:
+				mission_set = {'error': 'The line is no valid JSON ({}).'.format(error)}
+
+			if not isinstance(mission_set, dict):
+				mission_set = {'error': 'The line is no JSON object.'}
+
+			mission_set.setdefault('id', i)
+			yield mission_set
+	finally:
+		if f is not sys.stdin:
+			f.close()
+
+
+# This function raises ValueError if < mission_set > is broken: if it isn't 
+# a dict, if 'origin' isn't a name or 'travelers' isn't a list of lists of 
+# names (or if 'instance' isn't a path instead of the two).
+def check_mission_set(mission_set):
+	if not isinstance(mission_set, dict):
+		raise ValueError("A mission set needs to be a JSON object.")
+
+	if 'error' in mission_set:
+		raise ValueError(mission_set['error'])
+
+	if 'instance' in mission_set:
+		if not isinstance(mission_set['instance'], str):
+			raise ValueError("'instance' needs to be the path to an instance file.")
+		return
+
+	if not isinstance(mission_set.get('origin'), str):
+		raise ValueError("'origin' needs to be the name of a system.")
+
+	travelers = mission_set.get('travelers')
+	if not isinstance(travelers, list) or \
+				not all([isinstance(x, list) for x in travelers]) or \
+				not all([isinstance(y, str) for x in travelers for y in x]):
+		this = "'travelers' needs to be a list that contains a list of system "
+		that = "names for each traveler."
+		raise ValueError(this + that)
+
+
+# This function returns True if < mission_set > is not broken (see 
+# check_mission_set()).
+def is_valid(mission_set):
+	try:
+		check_mission_set(mission_set)
+	except ValueError:
+		return False
+
+	return True
+
+
+# This class looks up the coordinates of all systems of all mission sets.
+# It does everything like class DataGrabber (using the cache, EDSM or a
+# galaxy index), except that it doesn't have missions of its own.
+# Systems whose coordinates can't be found (or if EDSM didn't answer) don't 
+# stop it. They are just noted in < self.problems >. Just the mission sets 
+# that contain one of them fail (see class MissionSet).
+class SystemStore(cd.DataGrabber):
+	# < mission_sets > is a list of mission sets. See class DataGrabber for
+	# the other parameters.
+	def __init__(self, mission_sets, cache_file = None, \
+					edsm_url = 'https://www.edsm.net/api-v1/', galaxy_index = None):
+		self.mission_sets = mission_sets
+		# A dict with the names of the systems whose coordinates couldn't be 
+		# found as keys and why as values.
+		self.problems = {}
+
+		cd.DataGrabber.__init__(self, None, cache_file, edsm_url, galaxy_index)
+
+
+	# The missions are in < self.mission_sets >.
+	def _get_missions(self):
+		pass
+
+
+	# This method looks up the coordinates of all systems like 
+	# _get_coordinates() of class DataGrabber. The coordinates of the systems 
+	# in < self.problems > are NaN.
+	def _get_coordinates(self):
+		self._add_systems()
+		names = self.system_names
+
+		try:
+			if self.galaxy_index is not None:
+				coordinates = self._get_indexed_coordinates(names)
+			else:
+				coordinates = self._get_remote_coordinates(names)
+		except cd.EDSMError as error:
+			# EDSM didn't answer. At least the systems in the cache can be 
+			# used.
+			coordinates = self._get_cached_coordinates(names)
+			for name in names:
+				if name not in coordinates:
+					self.problems[name] = str(error)
+
+		unknown = {'x': np.nan, 'y': np.nan, 'z': np.nan}
+		self.coordinates = np.array([[coordinates.get(name, unknown)['x'], \
+						coordinates.get(name, unknown)['y'], \
+						coordinates.get(name, unknown)['z']] for name in names], \
+														dtype = np.float64)
+
+
+	# The systems in < unknown > are noted in < self.problems > instead of 
+	# stopping everything.
+	def _unknown_systems(self, unknown, this):
+		for name in unknown:
+			this = "The coordinates of {} couldn't be found ".format(name)
+			that = "(please check the spelling)."
+			self.problems[name] = this + that
+
+
+	# This method gives all systems of all mission sets an id. Broken 
+	# mission sets are left out.
+	def _add_systems(self):
+		for mission_set in self.mission_sets:
+			if 'instance' in mission_set or not is_valid(mission_set):
+				continue
+
+			self._add_system(mission_set['origin'])
+
+			for destinations_per_traveler in mission_set['travelers']:
+				for destination in destinations_per_traveler:
+					self._add_system(destination)
+
+
+	# The distances between ALL systems of ALL mission sets are not needed
+	# and may need a lot of memory for large batches. Each mission set
+	# calculates just the distances between its own systems.
+	def _get_distances(self):
+		pass
+
+
+# This class does the same as class DataGrabber for one mission set, except
+# that it takes the coordinates from a SystemStore instance.
+class MissionSet(cd.DataGrabber):
+	# < mission_set > is, well, the mission set and < store > the SystemStore
+	# instance with the coordinates of its systems.
+	def __init__(self, mission_set, store):
+		self.mission_set = mission_set
+		self.store = store
+
+		cd.DataGrabber.__init__(self, None)
+
+
+	# The missions are already in < self.mission_set >.
+	def _get_missions(self):
+		self.origin = self.mission_set['origin']
+		self.travelers = [list(x) for x in self.mission_set['travelers']]
+
+
+	# This method takes the coordinates of all systems from < self.store >. 
+	# Raises EDSMError if one of them couldn't be found.
+	def _get_coordinates(self):
+		self._add_systems()
+
+		problems = [self.store.problems[x] for x in self.system_names \
+													if x in self.store.problems]
+		# Several systems may have the same problem (e.g. EDSM didn't answer).
+		if problems:
+			raise cd.EDSMError(' '.join(dict.fromkeys(problems)))
+
+		ids = [self.store.system_ids[name] for name in self.system_names]
+		self.coordinates = self.store.coordinates[ids]
+
+
+# This function finds the route for < mission_set > with the coordinates in
+# < store >. Returns a dict with the results that can be written as JSON (see
+# find_route()).
+def solve(mission_set, store, maximum_allowed_time, solver = 'auto'):
+	try:
+		check_mission_set(mission_set)
+
+		with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+			if 'instance' in mission_set:
+				datagrabber = cif.InstanceFile(mission_set['instance'])
+			else:
+				datagrabber = MissionSet(mission_set, store)
+	except Exception as error:
+		return {'id': mission_set.get('id'), \
+					'error': '{}: {}'.format(type(error).__name__, error)}
+
+	return find_route(datagrabber, maximum_allowed_time, solver, mission_set.get('id'))
+
+
+# This function finds the route for the missions in < datagrabber > (a
+# DataGrabber instance). All output of class Routefinder is suppressed.
+# Returns a dict with < this_id >, the route, its length and the numbers of
+# class SearchStats. If something went wrong it contains just < this_id >
+# and the error.
+def find_route(datagrabber, maximum_allowed_time, solver = 'auto', this_id = None):
+	result = {'id': this_id}
+
+	try:
+		with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+			routefinder = cr.Routefinder(datagrabber, maximum_allowed_time, solver = solver)
+	except Exception as error:
+		result['error'] = '{}: {}'.format(type(error).__name__, error)
+		return result
+
+	result['route'] = routefinder.record_path
+	result['length'] = routefinder.record_length
+	result['optimal'] = routefinder.optimal
+	result['stats'] = routefinder.stats.to_dict()
+
+	return result
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
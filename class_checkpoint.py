@@ -0,0 +1,113 @@
+#    "class_checkpoint" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that writes the
+# state of a (long) search to a file from time to time, so that the search
+# can be continued later if the program is stopped (see --checkpoint and
+# --resume).
+#
+# The state consists of the best route so far, the seed of the random
+# number generator of class Routefinder and the "frontier" of the recursive
+# search: the path _extend_route() was working on. The path is all that is
+# needed since it determines which possibilities were already searched
+# through (all the ones that come before it, see _resume_point() in class
+# Routefinder). It is small and thus writing the file takes no time worth
+# mentioning.
+
+
+from hashlib import sha256
+from time import time
+import json
+import os
+
+
+# This class is instantiated in the main program and handed to class
+# Routefinder, which calls its methods during the search.
+class Checkpoint(object):
+	# < path > is the complete path to the checkpoint file.
+	# < interval > is the minimum time (in seconds) between writing the file.
+	# < resume > is True if the state in the file (if it exists) shall be
+	# used to continue the search.
+	def __init__(self, path, interval = 60.0, resume = False):
+		self.path = path
+		self.interval = interval
+		# The state read from the file. None if there is none.
+		self.state = None
+		self.last_save_time = time()
+
+		if resume and os.path.exists(path):
+			with open(path, 'r') as f:
+				self.state = json.load(f)
+
+
+	# This method returns the state in the file if it belongs to the same
+	# missions as < routefinder > and None otherwise.
+	def state_for(self, routefinder):
+		if self.state is None:
+			return None
+
+		if self.state['missions'] != self._missions_key(routefinder):
+			this = "The checkpoint in {} belongs to different ".format(self.path)
+			that = "missions. Starting from scratch ...\n"
+			print(this + that)
+			return None
+
+		return self.state
+
+
+	# This method writes the state of < routefinder > if the last time this
+	# happened is at least < self.interval > seconds ago. < frontier > is the
+	# path (a list of ids) the recursive search is working on or None if
+	# there is none.
+	def maybe_save(self, routefinder, frontier = None):
+		if time() - self.last_save_time >= self.interval:
+			self.save(routefinder, frontier)
+
+
+	# This method writes the state of < routefinder >. See maybe_save().
+	def save(self, routefinder, frontier = None):
+		state = {}
+		state['missions'] = self._missions_key(routefinder)
+		state['seed'] = routefinder.seed
+		state['record_path'] = routefinder.record_path
+		state['record_length'] = routefinder.record_length
+		state['optimal'] = routefinder.optimal
+		state['frontier'] = None
+		if frontier is not None:
+			state['frontier'] = [routefinder.names[x] for x in frontier]
+
+		# The file is replaced at once. Thus, a program that is killed while
+		# writing never leaves a broken file behind.
+		temporary_file = self.path + '.tmp'
+		with open(temporary_file, 'w') as f:
+			json.dump(state, f)
+		os.replace(temporary_file, self.path)
+
+		self.last_save_time = time()
+
+
+	# This method returns a string that is the same for the same missions
+	# (the destinations that still need to be visited, where the route
+	# starts and ends). Contrary to the result cache (see
+	# class_resultcache.py) the order of the travelers matters, since the
+	# frontier depends on it.
+	def _missions_key(self, routefinder):
+		content = [routefinder.origin, routefinder.names[routefinder.start], \
+														routefinder.travelers]
+
+		return sha256(json.dumps(content).encode()).hexdigest()
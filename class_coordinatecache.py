@@ -0,0 +1,115 @@
+#    "class_coordinatecache" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that stores the
+# coordinates of systems on disk.
+# The coordinates of a star system never change. Hence, there is no need to
+# ask EDSM.net for them again and again on every run. Once fetched they are
+# stored in a small SQLite database and looked up there the next time.
+
+
+import os
+import sqlite3
+
+
+# This class stores and looks up the coordinates of systems. It is
+# instantiated in class DataGrabber.
+class CoordinateCache(object):
+	# < path > is the complete path to the database file (incl. filename and
+	# extension). It is created if it doesn't exist.
+	def __init__(self, path):
+		self.path = path
+
+		directory = os.path.dirname(os.path.abspath(path))
+		if not os.path.isdir(directory):
+			os.makedirs(directory)
+
+		self.connection = sqlite3.connect(path)
+		# Names of systems are case-insensitive on EDSM. Thus, the same is
+		# true in here.
+		self.connection.execute("""CREATE TABLE IF NOT EXISTS coordinates (
+									name TEXT PRIMARY KEY COLLATE NOCASE,
+									x REAL NOT NULL,
+									y REAL NOT NULL,
+									z REAL NOT NULL)""")
+		self.connection.commit()
+
+
+	# This method returns a dict with all names in < names > as keys that are
+	# in the cache. The values are dicts with the keys 'x', 'y' and 'z' (like
+	# EDSM returns them). Names that are not in the cache are missing in it.
+	# All names are looked up with as few queries as possible.
+	def get_many(self, names):
+		names = list(names)
+		found = {}
+		# The lower case names are needed to find the names as they were
+		# given in < names > since the database may return them in a
+		# different case.
+		lower_names = {}
+		for name in names:
+			lower_names.setdefault(name.lower(), []).append(name)
+
+		# SQLite allows just a limited number of variables in a query.
+		for i in range(0, len(names), 500):
+			chunk = names[i:i + 500]
+			placeholders = ', '.join(['?'] * len(chunk))
+			query = "SELECT name, x, y, z FROM coordinates WHERE name IN ({})"
+			rows = self.connection.execute(query.format(placeholders), chunk)
+
+			for name, x, y, z in rows:
+				for original_name in lower_names.get(name.lower(), []):
+					found[original_name] = {'x': x, 'y': y, 'z': z}
+
+		return found
+
+
+	# This method stores the coordinates in < coordinates > (a dict like the
+	# one returned by get_many()) in the cache.
+	def put_many(self, coordinates):
+		rows = [(name, x['x'], x['y'], x['z']) for name, x in coordinates.items()]
+		query = "INSERT OR REPLACE INTO coordinates (name, x, y, z) VALUES (?, ?, ?, ?)"
+
+		self.connection.executemany(query, rows)
+		self.connection.commit()
+
+
+	# This method closes the connection to the database file.
+	def close(self):
+		self.connection.close()
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
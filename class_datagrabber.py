@@ -23,10 +23,59 @@
 # The latter es fetched from EDSM.net via its api.
 
 
-from math import sqrt
-import requests
+from time import sleep, time
+import threading
+import numpy as np
 import json
 
+import class_coordinatecache as ccc
+import class_galaxyindex as cgi
+
+
+# This exception is raised if the coordinates can't be fetched from EDSM. 
+# Either because a system is unknown to EDSM or because EDSM didn't answer 
+# properly even after several retries.
+class EDSMError(Exception):
+	pass
+
+
+# This exception is raised in the latter case. Contrary to an unknown system 
+# it makes sense to try again later.
+class EDSMUnavailable(EDSMError):
+	pass
+
+
+# This function reads the relevant mission data (and the point of origin)
+# from the mission file < path >. Returns the origin and a list that 
+# contains lists that contain the destinations for each traveler in the 
+# correct order.
+def read_missions(path):
+	origin = None
+	travelers = []
+	mission_data = False
+
+	with open(path, 'r') as f:
+		for line in f:
+			splitted = line.strip().split('\t')
+
+			if "I'm at" in line:
+				origin = splitted[1]
+			elif '< Missions START >' in line:
+				mission_data = True
+				continue
+
+			# .strip() removes fortunately all leading (and trailing)
+			# whitespaces (incl. tabs). Thus the first element will always
+			# have content if it is valid mission data.
+			if mission_data and splitted[0] != '':
+				# With this I'll try to accomodate for too many tabs
+				# in the data provided by the user.
+				destinations = [x for x in splitted if len(x.strip()) > 0]
+
+				travelers.append(destinations)
+
+	return origin, travelers
+
 
 # This class is doing all get the mission information and all data needed to 
 # calculate the length of a route.
@@ -35,119 +84,339 @@ class DataGrabber(object):
 	# < infile > is the complete path to the mission data file. This includes
 	# the filename and its extension! By default the path is the current
 	# directory and the filename is "000_missions.txt".
-	def __init__(self, infile):
+	# < cache_file > is the complete path to the file in which fetched 
+	# coordinates are stored (see class_coordinatecache.py). If None, the 
+	# coordinates are always fetched from EDSM.
+	# < edsm_url > is the base url of the EDSM api. It exists mainly to be 
+	# able to use a different server for testing.
+	# < galaxy_index > is the complete path to a galaxy index file (see 
+	# class_galaxyindex.py). If given, ALL coordinates are looked up in it and 
+	# EDSM (and the cache) is not used at all.
+	def __init__(self, infile, cache_file = None, \
+						edsm_url = 'https://www.edsm.net/api-v1/', galaxy_index = None):
 		self.mission_file = infile
+		self.cache_file = cache_file
+		self.edsm_url = edsm_url
+		self.galaxy_index = galaxy_index
+		# The coordinates of up to < self.systems_per_request > systems are 
+		# requested from EDSM at once and up to < self.parallel_requests > of 
+		# these requests are sent at the same time.
+		self.systems_per_request = 50
+		self.parallel_requests = 4
+		# If EDSM doesn't answer properly a request is repeated up to 
+		# < self.maximum_retries > times. Before the n-th retry the program 
+		# waits < self.retry_delay * 2**(n - 1) > seconds to not hammer EDSM.
+		self.maximum_retries = 5
+		self.retry_delay = 0.5
+		# Each thread that sends requests has its own requests.Session to 
+		# re-use connections. See _session().
+		self._thread_data = threading.local()
 		# The system in which the travelers are picked up and to which they
 		# have to be brought back to. Will be set in _get_missions()
 		self.origin = None
 		# A list that contains lists that contain the destinations for each
 		# traveler in the correct order. Will be set in _get_missions()
 		self.travelers = []
-		# This will be a dict that contains each destination as a main-key. The 
-		# values are the coordinates of this destination and a subdict that
-		# again contains each destination as a sub-key. The values of the 
-		# sub-dict are the distances between the main-key destination and the 
-		# sub-key destination. Will be filled in _get_coordinates() 
-		# and _get_distances().
-		self.distances = {}
-
+		# Each system (origin and all destinations) gets an integer id. 
+		# < self.system_names[i] > is the name of the system with id i. 
+		# Origin has always id 0. Will be filled in _get_coordinates().
+		self.system_names = []
+		# The inverse of < self.system_names >. A dict with the names as keys 
+		# and the ids as values.
+		self.system_ids = {}
+		# A numpy array with shape (number of systems, 3). Row i contains the 
+		# x, y and z coordinates of the system with id i. Will be set in 
+		# _get_coordinates().
+		self.coordinates = None
+		# A numpy array with shape (number of systems, number of systems).
+		# < self.distance_matrix[i, j] > is the distance between the systems 
+		# with the ids i and j. Will be set in _get_distances().
+		self.distance_matrix = None
+		# How long (in seconds) each of the steps below took. See 
+		# class_searchstats.py.
+		self.phase_times = {}
+
+		start_time = time()
 		self._get_missions()
+		self.phase_times['missions'] = time() - start_time
+
+		start_time = time()
 		self._get_coordinates()
+		self.phase_times['coordinates'] = time() - start_time
+
+		start_time = time()
 		self._get_distances()
+		self.phase_times['distances'] = time() - start_time
+
+
+	# Instances are pickled to send them to other processes (see 
+	# class_solverdaemon.py). The requests.Sessions can't be pickled and 
+	# aren't needed anymore at that point.
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		del state['_thread_data']
+
+		return state
+
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self._thread_data = threading.local()
 
 
 	# This method reads the relevant mission data (and the point of origin)
 	# from the respective file.
 	def _get_missions(self):
-		mission_data = False
+		self.origin, self.travelers = read_missions(self.mission_file)
 
-		with open(self.mission_file, 'r') as f:
-			for line in f:
-				splitted = line.strip().split('\t')
 
-				if "I'm at" in line:
-					self.origin = splitted[1]
-				elif '< Missions START >' in line:
-					mission_data = True
-					continue
+	# To calculate the distances between two systems I'll need the coordinates.
+	# This method get's them and puts them all into < self.coordinates >.
+	# It also assigns the ids to all systems.
+	def _get_coordinates(self):
+		self._add_systems()
 
-				# .strip() removes fortunately all leading (and trailing)
-				# whitespaces (incl. tabs). Thus the first element will always
-				# have content if it is valid mission data.
-				if mission_data and splitted[0] != '':
-					# With this I'll try to accomodate for too many tabs
-					# in the data provided by the user.
-					destinations = [x for x in splitted if len(x.strip()) > 0]
+		if self.galaxy_index is not None:
+			coordinates = self._get_indexed_coordinates(self.system_names)
+		else:
+			coordinates = self._get_remote_coordinates(self.system_names)
 
-					self.travelers.append(destinations)
+		self.coordinates = np.array([[coordinates[name]['x'], coordinates[name]['y'], \
+								coordinates[name]['z']] for name in self.system_names], \
+																dtype = np.float64)
 
 
-	# To calculate the distances between two systems I'll need the coordinates.
-	# This method get's them and puts them all into < self.distances >.
-	def _get_coordinates(self):
-		self.distances[self.origin] = self._request_coords(self.origin)
+	# This method returns a dict with the coordinates of all systems in 
+	# < names >. The values are dicts with the keys 'x', 'y' and 'z'.
+	# The coordinates are looked up in the cache or fetched from EDSM.
+	def _get_remote_coordinates(self, names):
+		coordinates = self._get_cached_coordinates(names)
+
+		# Just the systems that are not in the cache need to be fetched (and
+		# stored in the cache afterwards).
+		missing = [name for name in names if name not in coordinates]
+		fetched = self._request_coords(missing)
+
+		coordinates.update(fetched)
+		self._store_coordinates(fetched)
+
+		return coordinates
+
+
+	# Dito, but the coordinates are looked up in < self.galaxy_index >.
+	def _get_indexed_coordinates(self, names):
+		print("Looking up coordinates in", self.galaxy_index)
+
+		coordinates = cgi.GalaxyIndex(self.galaxy_index).get_many(names)
+
+		unknown = [name for name in names if name not in coordinates]
+		if unknown:
+			this = "The galaxy index doesn't contain: {}. ".format(', '.join(unknown))
+			self._unknown_systems(unknown, this)
+
+		return coordinates
+
+
+	# This method returns a dict with the coordinates of all systems in 
+	# < names > that are in the cache (all of them are looked up at once). 
+	# The values are dicts with the keys 'x', 'y' and 'z'.
+	def _get_cached_coordinates(self, names):
+		if self.cache_file is None:
+			return {}
+
+		cache = ccc.CoordinateCache(self.cache_file)
+		coordinates = cache.get_many(names)
+		cache.close()
+
+		return coordinates
+
+
+	# This method stores < coordinates > (a dict like the one returned by 
+	# _get_cached_coordinates()) in the cache.
+	def _store_coordinates(self, coordinates):
+		if self.cache_file is None or not coordinates:
+			return
+
+		cache = ccc.CoordinateCache(self.cache_file)
+		cache.put_many(coordinates)
+		cache.close()
+
+
+	# This method gives all systems an id. Origin gets id 0.
+	def _add_systems(self):
+		self._add_system(self.origin)
 
 		for destinations_per_traveler in self.travelers:
 			for destination in destinations_per_traveler:
 				# Different travelers might want to go to the same destination.
 				# No need to request the coordinates for them again.
-				try:
-					self.distances[destination]
-				except KeyError:
-					self.distances[destination] = self._request_coords(destination)
+				self._add_system(destination)
+
+
+	# This method adds the system < name > (if it is not there yet) after 
+	# everything else is done. E.g. the system I'm in when the route is 
+	# planned anew if no traveler wants to go there anymore (see replan() 
+	# in class Routefinder). Its coordinates are looked up like the ones of 
+	# all other systems and the distances to it are added.
+	def add_system(self, name):
+		if name in self.system_ids:
+			return
+
+		if self.galaxy_index is not None:
+			coordinates = self._get_indexed_coordinates([name])[name]
+		else:
+			coordinates = self._get_remote_coordinates([name])[name]
+
+		position = np.array([coordinates['x'], coordinates['y'], coordinates['z']], \
+															dtype = np.float64)
+		distances = np.sqrt(((self.coordinates - position)**2).sum(axis = 1))
+
+		size = len(self.system_names)
+		distance_matrix = np.zeros((size + 1, size + 1))
+		distance_matrix[:size, :size] = self.distance_matrix
+		distance_matrix[size, :size] = distances
+		distance_matrix[:size, size] = distances
+
+		self._add_system(name)
+		self.coordinates = np.vstack([self.coordinates, position])
+		self.distance_matrix = distance_matrix
+
+
+	# This method gives < name > the next free id if it doesn't have one yet.
+	def _add_system(self, name):
+		if name not in self.system_ids:
+			self.system_ids[name] = len(self.system_names)
+			self.system_names.append(name)
+
+
+	# This method gets the coordinates of all systems in < names > from EDSM. 
+	# Returns a dict with the names as keys and dicts with the keys 'x', 'y' 
+	# and 'z' as values.
+	# Originally each system was requested on its own, one after the other. 
+	# With many destinations waiting for the answers needed more time than 
+	# anything else. Now EDSM is asked for many systems at once and several 
+	# of these requests are sent at the same time.
+	def _request_coords(self, names):
+		# Imported just here since importing it takes longer than everything 
+		# else that happens before the search starts if all coordinates are 
+		# known already (see also _get()).
+		from concurrent.futures import ThreadPoolExecutor
+
+		chunks = [names[i:i + self.systems_per_request] \
+							for i in range(0, len(names), self.systems_per_request)]
+
+		if not chunks:
+			return {}
+
+		with ThreadPoolExecutor(max_workers = self.parallel_requests) as executor:
+			answers = list(executor.map(self._request_chunk, chunks))
+
+		coordinates = {}
+		for answer in answers:
+			coordinates.update(answer)
+
+		# EDSM just leaves out systems it doesn't know. Originally this 
+		# crashed the program with a not very helpful KeyError.
+		unknown = [name for name in names if name not in coordinates]
+		if unknown:
+			this = "EDSM doesn't know the coordinates of: {}. ".format(', '.join(unknown))
+			self._unknown_systems(unknown, this)
+
+		return coordinates
+
+
+	# This method is called with the names of the systems whose coordinates 
+	# couldn't be found (< unknown >). < this > says where they weren't 
+	# found. Raises EDSMError.
+	def _unknown_systems(self, unknown, this):
+		that = "Please check the spelling in the mission file."
+		raise EDSMError(this + that)
 
 
 	# This method does the actual request to EDSM to get ... well, what its 
-	# name says: the coordinates of a given < destination >.
-	def _request_coords(self, destination):
-		print("Fetching coordinates for", destination)
-		url = 'https://www.edsm.net/api-v1/system'
+	# name says: the coordinates of the systems in < names >.
+	def _request_chunk(self, names):
+		print("Fetching coordinates for", ', '.join(names))
+		url = self.edsm_url + 'systems'
+		payload = {'systemName[]': names, 'showCoordinates': 1}
+
+		systems = self._get(url, payload)
+
+		# The names in the answer may be written differently (upper and lower 
+		# case) than in the mission file.
+		lower_names = {}
+		for name in names:
+			lower_names.setdefault(name.lower(), []).append(name)
+
+		coordinates = {}
+		for system in systems:
+			if 'coords' not in system:
+				continue
+
+			for name in lower_names.get(system['name'].lower(), []):
+				coordinates[name] = system['coords']
 
-		while True:
-			payload = {'systemName':destination, 'showCoordinates':1}
-			system = requests.get(url, params = payload)
+		return coordinates
 
-			if system.status_code != requests.codes.ok:
+
+	# This method sends a GET request to < url > with < payload > as parameters 
+	# and returns the decoded answer. If it fails it is repeated with 
+	# increasing waiting times in between (see __init__()). Raises 
+	# EDSMUnavailable if the last attempt fails, too.
+	def _get(self, url, payload):
+		import requests
+
+		problem = None
+
+		for attempt in range(self.maximum_retries + 1):
+			if attempt > 0:
+				sleep(self.retry_delay * 2**(attempt - 1))
+
+			try:
+				answer = self._session().get(url, params = payload, timeout = 30)
+			except requests.RequestException as error:
+				problem = str(error)
+				continue
+
+			if answer.status_code != requests.codes.ok:
+				problem = "status code {}".format(answer.status_code)
 				continue
 
 			# The content I'm actualy interested in is a binary string.
-			return json.loads(system._content.decode())['coords']
+			try:
+				return json.loads(answer.content.decode())
+			except ValueError as error:
+				problem = "no JSON in the answer ({})".format(error)
 
+		this = "EDSM didn't answer properly after {} ".format(self.maximum_retries + 1)
+		that = "attempts (last problem: {}).".format(problem)
+		raise EDSMUnavailable(this + that)
 
-	# This method actually calculates the distance between two given points.
-	# < first > and < second > are the names of the points the distance shall 
-	# be calculated for.
-	def _calculate_distance(self, first, second):
-		x_1 = self.distances[first]['x']
-		y_1 = self.distances[first]['y']
-		z_1 = self.distances[first]['z']
 
-		x_2 = self.distances[second]['x']
-		y_2 = self.distances[second]['y']
-		z_2 = self.distances[second]['z']
+	# This method returns the requests.Session of the current thread.
+	def _session(self):
+		if not hasattr(self._thread_data, 'session'):
+			import requests
 
-		return sqrt((x_1 - x_2)**2 + (y_1 - y_2)**2 + (z_1 - z_2)**2)
+			self._thread_data.session = requests.Session()
 
+		return self._thread_data.session
 
-	# This method puts the actual distances into < self.distances >. 
+
+	# This method puts the actual distances into < self.distance_matrix >. 
 	# The distances between ALL destinations are calculated. This takes some 
 	# time to do it once, but has the advantage that I don't need to do the 
 	# calculations again when going through all possible routes but can just 
-	# look the values up in < self.distances >. Doing it that way saves almost
-	# 25 percent of the overall process time!
+	# look the values up. Doing it that way saves almost 25 percent of the 
+	# overall process time!
+	# All distances are calculated in one go by numpy. The differences of 
+	# all pairs of coordinates are obtained via broadcasting.
 	def _get_distances(self):
 		print("\nCalculating distances ...\n")
 
-		# The distances between ALL points are calculated.
-		for first in self.distances:
-			for second in self.distances:
-				# Since this is a symmetrical problem had I originally a check 
-				# if a distance was already calculated to avoid double
-				# calculations. It then turned out that this here is certainly 
-				# NOT a bottleneck and to make the code a bit easier I simply 
-				# calculate everything twice.
-				distance = self._calculate_distance(first, second)
-				self.distances[first][second] = distance
+		differences = self.coordinates[:, np.newaxis, :] - self.coordinates[np.newaxis, :, :]
+		self.distance_matrix = np.sqrt((differences**2).sum(axis = 2))
+
 
 
 
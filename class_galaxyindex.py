@@ -0,0 +1,239 @@
+#    "class_galaxyindex" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that looks up the
+# coordinates of systems in a file on disk instead of asking EDSM.net. This
+# makes it possible to use this program on computers without access to EDSM.
+#
+# Said file (the "galaxy index") is built by build_index() from the dump of
+# all systems EDSM provides (systemsWithCoordinates.json.gz). The dump
+# contains tens of millions of systems. Thus, it is read line by line and
+# never held in memory as a whole.
+#
+# The galaxy index consists of three parts:
+# - A header with the number of systems and where the other parts start.
+# - A table with one entry per system with a 64 bit hash of its (lower case)
+#   name, where its name is stored and its coordinates (as 32 bit floats).
+#   The entries are sorted by the hash. Thus, a system can be found by a
+#   binary search.
+# - The names of all systems (UTF-8), one after the other.
+# The file is memory-mapped. Hence, opening it takes no time at all and just
+# the few parts of it that are needed for a lookup are ever read from disk.
+
+
+from hashlib import blake2b
+import tempfile
+import shutil
+import struct
+import json
+import gzip
+import os
+import numpy as np
+
+
+# The first bytes of a galaxy index file.
+MAGIC = b'VMOGIDX1'
+# The header consists of MAGIC, the number of systems, and the positions
+# (in bytes from the beginning of the file) of the table and of the names.
+HEADER = struct.Struct('<8sQQQ')
+# One entry of the table.
+ENTRY = np.dtype([('hash', '<u8'), ('name_offset', '<u8'), ('name_length', '<u4'), \
+							('x', '<f4'), ('y', '<f4'), ('z', '<f4')])
+# The same layout as struct. Packing a single entry with this is much faster
+# than with numpy.
+ENTRY_STRUCT = struct.Struct('<QQIfff')
+# During building, the entries are first distributed into this many
+# temporary files (by the highest bits of their hash). Each of them is
+# small enough to be sorted in memory.
+NUMBER_OF_BUCKETS = 256
+
+
+# This function returns the 64 bit hash of the system < name >. Names of
+# systems are case-insensitive on EDSM.
+def name_hash(name):
+	digest = blake2b(name.lower().encode('utf-8'), digest_size = 8).digest()
+
+	return int.from_bytes(digest, 'big')
+
+
+# This function builds the galaxy index < index_file > from the EDSM dump
+# < dump_file > (gzip compressed JSON with one system per line). Returns the
+# number of systems in the index.
+def build_index(dump_file, index_file):
+	temporary_directory = tempfile.mkdtemp(dir = os.path.dirname(os.path.abspath(index_file)))
+
+	try:
+		names_file = os.path.join(temporary_directory, 'names')
+		bucket_files = [os.path.join(temporary_directory, 'bucket_{}'.format(i)) \
+											for i in range(NUMBER_OF_BUCKETS)]
+
+		number_of_systems = _distribute_systems(dump_file, names_file, bucket_files)
+
+		table_offset = HEADER.size
+		names_offset = table_offset + number_of_systems * ENTRY.itemsize
+
+		with open(index_file, 'wb') as f:
+			f.write(HEADER.pack(MAGIC, number_of_systems, table_offset, names_offset))
+
+			# The buckets are defined by the highest bits of the hash. Hence,
+			# writing the sorted buckets one after the other results in a
+			# completely sorted table.
+			for bucket_file in bucket_files:
+				entries = np.fromfile(bucket_file, dtype = ENTRY)
+				entries.sort(order = 'hash', kind = 'stable')
+				entries.tofile(f)
+
+			with open(names_file, 'rb') as names:
+				shutil.copyfileobj(names, f)
+	finally:
+		shutil.rmtree(temporary_directory)
+
+	return number_of_systems
+
+
+# This function reads the systems in < dump_file > line by line, appends
+# their names to < names_file > and their table entries to the respective
+# file in < bucket_files >. Returns the number of systems.
+def _distribute_systems(dump_file, names_file, bucket_files):
+	number_of_systems = 0
+	name_offset = 0
+	shift = 64 - (NUMBER_OF_BUCKETS.bit_length() - 1)
+
+	buckets = [open(x, 'wb') for x in bucket_files]
+	try:
+		with gzip.open(dump_file, 'rt', encoding = 'utf-8') as dump, \
+											open(names_file, 'wb') as names:
+			for line in dump:
+				# The dump is ONE big JSON list. Each system is in its own
+				# line that ends with a comma (except the last one).
+				line = line.strip().rstrip(',')
+				if not line.startswith('{'):
+					continue
+
+				system = json.loads(line)
+				if 'coords' not in system:
+					continue
+
+				encoded_name = system['name'].encode('utf-8')
+				this_hash = name_hash(system['name'])
+
+				coordinates = system['coords']
+				entry = ENTRY_STRUCT.pack(this_hash, name_offset, len(encoded_name), \
+						coordinates['x'], coordinates['y'], coordinates['z'])
+
+				buckets[this_hash >> shift].write(entry)
+				names.write(encoded_name)
+
+				name_offset += len(encoded_name)
+				number_of_systems += 1
+	finally:
+		for bucket in buckets:
+			bucket.close()
+
+	return number_of_systems
+
+
+# This class looks up the coordinates of systems in a galaxy index. It is
+# instantiated in class DataGrabber.
+class GalaxyIndex(object):
+	# < path > is the complete path to the galaxy index file (incl. filename
+	# and extension).
+	def __init__(self, path):
+		self.path = path
+
+		with open(path, 'rb') as f:
+			magic, self.number_of_systems, table_offset, self.names_offset = \
+												HEADER.unpack(f.read(HEADER.size))
+
+		if magic != MAGIC:
+			raise ValueError("{} is not a galaxy index file.".format(path))
+
+		self.data = np.memmap(path, dtype = np.uint8, mode = 'r')
+		self.table = np.ndarray((self.number_of_systems, ), dtype = ENTRY, \
+								buffer = self.data, offset = table_offset)
+
+
+	# This method returns a dict with all names in < names > as keys that are
+	# in the galaxy index. The values are dicts with the keys 'x', 'y' and 'z'
+	# (like EDSM returns them). Names that are not in the index are missing
+	# in it.
+	def get_many(self, names):
+		found = {}
+
+		for name in names:
+			coordinates = self.get(name)
+			if coordinates is not None:
+				found[name] = coordinates
+
+		return found
+
+
+	# This method returns the coordinates of the system < name > (a dict like
+	# in get_many()) or None if it is not in the galaxy index.
+	def get(self, name):
+		this_hash = name_hash(name)
+		hashes = self.table['hash']
+
+		# Binary search for the first entry with this hash. This is done by
+		# hand since np.searchsorted() would copy the whole (non-contiguous)
+		# column of hashes and thus read the whole table from disk.
+		low = 0
+		high = self.number_of_systems
+		while low < high:
+			middle = (low + high) // 2
+			if int(hashes[middle]) < this_hash:
+				low = middle + 1
+			else:
+				high = middle
+
+		# Different names may have the same hash (very, very unlikely but
+		# possible). Hence, all entries with the same hash are checked.
+		i = low
+		while i < self.number_of_systems and int(hashes[i]) == this_hash:
+			entry = self.table[i]
+			start = self.names_offset + int(entry['name_offset'])
+			stored_name = bytes(self.data[start:start + int(entry['name_length'])])
+
+			if stored_name.decode('utf-8').lower() == name.lower():
+				return {'x': float(entry['x']), 'y': float(entry['y']), \
+													'z': float(entry['z'])}
+			i += 1
+
+		return None
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
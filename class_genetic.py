@@ -0,0 +1,323 @@
+#    "class_genetic" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that finds a good
+# route for (very) many destinations with a genetic algorithm.
+# Like simulated annealing (see class_annealer.py) it does NOT go through
+# all possible routes. It keeps a "population" of routes. The shorter a
+# route is, the more likely it is combined with another one to make a new
+# route for the next "generation". The new routes are changed a little bit
+# by chance. This way the population gets better and better until the
+# maximum allowed time is used up.
+
+
+from time import time
+import numpy as np
+
+
+# The object that contains all methods that are necessary for the genetic
+# algorithm. It is instantiated in class Routefinder.
+#
+# A route is represented as a list of traveler indices ("genes"). Each
+# traveler appears as often as it has destinations. The k-th time a traveler
+# appears in the list stands for its k-th destination. Hence, ANY order of
+# the genes is a route in which the destinations of each traveler are
+# visited in the correct order, and the genes can be mixed and changed
+# freely.
+# The whole population is a numpy array with one row per route. All routes
+# are converted into systems and their lengths are calculated at once.
+class Genetic(object):
+	# < routefinder > is the class Routefinder instance that contains the
+	# missions and the distances and that stores the best route.
+	# < population_size > is the number of routes in the population.
+	# < seed > is for the random number generator. If None, each run is
+	# different.
+	def __init__(self, routefinder, population_size = 200, seed = None):
+		self.routefinder = routefinder
+		self.distance_matrix = routefinder.distance_matrix
+		self.population_size = max(4, population_size)
+		self.random = np.random.default_rng(seed)
+		# The id of the system the route starts in (see class Routefinder).
+		self.start = routefinder.start
+
+		chains = routefinder.chains
+		self.number_of_travelers = len(chains)
+		# The genes of one route: each traveler as often as it has
+		# destinations, in the order of the travelers.
+		self.genes = np.array([i for i, chain in enumerate(chains) for x in chain], \
+																dtype = np.int64)
+		# The system of each destination of each traveler in the same order.
+		# Sorting the genes of a route (keeping the order of equal genes)
+		# puts the k-th gene of traveler i at the position of its k-th
+		# destination in here. See _systems().
+		self.systems = np.array([x for chain in chains for x in chain], dtype = np.int64)
+
+		# The number of routes that are taken over into the next generation
+		# unchanged (the best ones), the number of routes each parent is
+		# chosen from and the probability that a new route is changed.
+		self.elite = 2
+		self.tournament_size = 3
+		self.mutation_probability = 0.5
+		# How often the new routes are improved by swapping neighbours (see
+		# _improve()). Without this the population hardly got better than
+		# the first route during testing.
+		self.improvement_rounds = 3
+		# Every this many generations the best route of the other processes
+		# (if there are any, see class Routefinder) joins the population.
+		self.migration_interval = 50
+
+
+	# This method does the actual evolution until < maximum_allowed_time >
+	# (counted from < start_time >) is used up or the search is cancelled
+	# (see class Routefinder). The best route found is handed to the
+	# Routefinder instance.
+	def run(self, start_time, maximum_allowed_time):
+		routefinder = self.routefinder
+
+		if len(self.genes) == 0:
+			routefinder._new_record([self.start], self.distance_matrix[self.start, 0])
+			return
+
+		# The population starts with the best route so far (the one of
+		# _find_greedy_route() or the incumbent of class Routefinder) and
+		# random routes.
+		population = np.array([self.random.permutation(self.genes) \
+									for x in range(self.population_size)])
+		path = [routefinder.ids[x] for x in routefinder.record_path[:-1]]
+		population[0] = self._genes_from_path(path)
+
+		best_length = routefinder.record_length
+		generation = 0
+
+		while True:
+			generation += 1
+
+			if (time() - start_time) > maximum_allowed_time or \
+							routefinder._stop_requested():
+				break
+
+			lengths = self._lengths(population)
+			routefinder.nodes += len(population)
+
+			best = np.argmin(lengths)
+			if lengths[best] < best_length - 1e-9:
+				best_length = lengths[best]
+				self._report(population[best])
+
+			if generation % self.migration_interval == 0:
+				self._migrate(population, lengths)
+
+			population = self._next_generation(population, lengths)
+
+
+	# This method returns the lengths of all routes in < population > (incl.
+	# the ways from the start system and to origin).
+	def _lengths(self, population):
+		routes = self._systems(population)
+		number_of_routes = len(routes)
+
+		lengths = self.distance_matrix[self.start, routes[:, 0]]
+		lengths += self.distance_matrix[routes[:, :-1], routes[:, 1:]].sum(axis = 1)
+		lengths += self.distance_matrix[routes[:, -1], np.zeros(number_of_routes, dtype = np.int64)]
+
+		return lengths
+
+
+	# This method converts all routes in < population > into the systems
+	# they visit (one row per route). See __init__().
+	def _systems(self, population):
+		order = np.argsort(population, axis = 1, kind = 'stable')
+		routes = np.empty_like(population)
+		np.put_along_axis(routes, order, self.systems[None, :], axis = 1)
+
+		return routes
+
+
+	# This method makes the next generation from < population > with the
+	# < lengths > of its routes.
+	def _next_generation(self, population, lengths):
+		number_of_children = len(population) - self.elite
+
+		# Tournament selection: each parent is the shortest of a few random
+		# routes.
+		contestants = self.random.integers(len(population), \
+						size = (2, number_of_children, self.tournament_size))
+		winners = np.argmin(lengths[contestants], axis = 2)
+		parents = np.take_along_axis(contestants, winners[:, :, None], axis = 2)[:, :, 0]
+
+		children = self._crossover(population[parents[0]], population[parents[1]])
+		self._mutate(children)
+		self._improve(children)
+
+		elite = population[np.argsort(lengths)[:self.elite]]
+
+		return np.concatenate([elite, children])
+
+
+	# This method mixes the routes < first > and < second > (one pair per
+	# row): the genes of a random subset of the travelers stay where they
+	# are in < first > and the other genes are put into the remaining
+	# positions in the order in which they are in < second >. Thus, each
+	# child is again a valid route.
+	def _crossover(self, first, second):
+		number_of_children, number_of_genes = first.shape
+		rows = np.arange(number_of_children)[:, None]
+
+		kept = self.random.random((number_of_children, self.number_of_travelers)) < 0.5
+		kept_in_first = np.take_along_axis(kept, first, axis = 1)
+		kept_in_second = np.take_along_axis(kept, second, axis = 1)
+
+		# The positions (in < first >) and genes (from < second >) that are
+		# NOT kept come first (in their order) after sorting by < kept >.
+		# There are equally many of both.
+		positions = np.argsort(kept_in_first, axis = 1, kind = 'stable')
+		genes = second[rows, np.argsort(kept_in_second, axis = 1, kind = 'stable')]
+		replaced = np.arange(number_of_genes)[None, :] < \
+								(~kept_in_first).sum(axis = 1)[:, None]
+
+		children = first.copy()
+		children[rows, positions] = np.where(replaced, genes, first[rows, positions])
+
+		return children
+
+
+	# This method changes some of the routes in < children > in place. Either
+	# two genes are swapped or a part of the route is reversed. Both give
+	# valid routes again.
+	def _mutate(self, children):
+		number_of_children, number_of_genes = children.shape
+		if number_of_genes < 2:
+			return
+
+		mutated = np.nonzero(self.random.random(number_of_children) < \
+										self.mutation_probability)[0]
+		ends = np.sort(self.random.integers(number_of_genes, size = (len(mutated), 2)), axis = 1)
+		swap = self.random.random(len(mutated)) < 0.5
+
+		first = ends[swap, 0]
+		second = ends[swap, 1]
+		rows = mutated[swap]
+		children[rows, first], children[rows, second] = children[rows, second], \
+															children[rows, first]
+
+		for row, (i, j) in zip(mutated[~swap], ends[~swap]):
+			children[row, i:j + 1] = children[row, i:j + 1][::-1]
+
+
+	# This method makes the routes in < population > shorter (in place) by
+	# swapping neighbouring genes of different travelers. This just swaps
+	# the two systems in the route. Hence, how much shorter each swap makes
+	# each route is calculated for all of them at once. In each round each
+	# route gets the swaps that help the most (but no two next to each
+	# other).
+	def _improve(self, population):
+		number_of_routes, number_of_genes = population.shape
+		if number_of_genes < 2:
+			return
+
+		distance_matrix = self.distance_matrix
+		starts = np.full((number_of_routes, 1), self.start, dtype = np.int64)
+		ends = np.zeros((number_of_routes, 1), dtype = np.int64)
+		no_swap = np.full((number_of_routes, 1), np.inf)
+
+		for x in range(self.improvement_rounds):
+			routes = np.concatenate([starts, self._systems(population), ends], axis = 1)
+			# Swapping b and c in ... a, b, c, d ...
+			a = routes[:, :-3]
+			b = routes[:, 1:-2]
+			c = routes[:, 2:-1]
+			d = routes[:, 3:]
+			delta = distance_matrix[a, c] + distance_matrix[c, b] + distance_matrix[b, d] \
+					- distance_matrix[a, b] - distance_matrix[b, c] - distance_matrix[c, d]
+			# Swapping two genes of the same traveler changes nothing.
+			delta[population[:, :-1] == population[:, 1:]] = 0.0
+
+			left = np.concatenate([no_swap, delta[:, :-1]], axis = 1)
+			right = np.concatenate([delta[:, 1:], no_swap], axis = 1)
+			rows, columns = np.nonzero((delta < -1e-9) & (delta <= left) & (delta < right))
+			if len(rows) == 0:
+				break
+
+			population[rows, columns], population[rows, columns + 1] = \
+							population[rows, columns + 1], population[rows, columns]
+
+
+	# This method replaces the longest route in < population > (with the
+	# < lengths > of its routes) with the best route of all processes if it
+	# is better than the best route of this one.
+	def _migrate(self, population, lengths):
+		shared = self.routefinder._shared_record()
+
+		if shared is not None and shared[1] < lengths.min() - 1e-9:
+			population[np.argmax(lengths)] = self._genes_from_path(shared[0])
+
+
+	# This method converts < path > (a list of system ids that starts with
+	# the start system, like in _find_best_route() of class Routefinder)
+	# into genes. All travelers that want to go to a system make progress
+	# when it is visited.
+	def _genes_from_path(self, path):
+		chains = self.routefinder.chains
+		progress = [0] * len(chains)
+
+		genes = []
+		for point in path[1:]:
+			for i, chain in enumerate(chains):
+				if progress[i] < len(chain) and chain[progress[i]] == point:
+					genes.append(i)
+					progress[i] += 1
+
+		return np.array(genes, dtype = np.int64)
+
+
+	# The other way round: this method converts < genes > into a list of
+	# system ids that starts with the start system. A destination is skipped
+	# if its traveler already got there because it was visited for another
+	# traveler. Thus, the path can just be shorter than the route the genes
+	# stand for.
+	def _path_from_genes(self, genes):
+		chains = self.routefinder.chains
+		progress = [0] * len(chains)
+		# How often each traveler appeared so far.
+		appeared = [0] * len(chains)
+		path = [self.start]
+
+		for traveler in genes.tolist():
+			appeared[traveler] += 1
+			if progress[traveler] >= appeared[traveler]:
+				continue
+
+			point = chains[traveler][appeared[traveler] - 1]
+			path.append(point)
+			for i, chain in enumerate(chains):
+				if progress[i] < len(chain) and chain[progress[i]] == point:
+					progress[i] += 1
+
+		return path
+
+
+	# This method hands < genes > as a new best route to the Routefinder
+	# instance.
+	def _report(self, genes):
+		path = self._path_from_genes(genes)
+		distance_table = self.routefinder.distance_table
+		length = 0.0
+		for first, second in zip(path, path[1:] + [0]):
+			length += distance_table[first][second]
+
+		self.routefinder._new_record(path, length)
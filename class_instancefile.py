@@ -0,0 +1,166 @@
+#    "class_instancefile" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that reads a
+# "compiled" set of missions. Before the search for a route can start, the
+# mission file needs to be read, the coordinates need to be looked up (in
+# the cache, in a galaxy index or at EDSM) and all distances need to be
+# calculated. If the same missions are solved again and again (e.g. with
+# different solvers or by several processes), this can be done once with
+# compile_instance() (see compile_instance.py) and the result is stored in
+# an "instance file" that contains everything class Routefinder needs.
+#
+# An instance file consists of:
+# - A header with the number of systems, travelers and destinations and a
+#   hash of everything that follows.
+# - The distance matrix (64 bit floats, one row after the other).
+# - The coordinates (64 bit floats, x, y and z of each system).
+# - Where the name of each system starts (and the last one ends) in the
+#   names below.
+# - Where the destinations of each traveler start (and the last ones end)
+#   in the destinations below.
+# - The ids of the destinations of all travelers, one after the other.
+# - The names of all systems (UTF-8), one after the other.
+# All parts but the names have 8 byte values. Thus, each of them can be used
+# directly from the memory-mapped file without copying it.
+
+
+from hashlib import sha256
+import struct
+import os
+import numpy as np
+
+import class_datagrabber as cd
+
+
+# The first bytes of an instance file.
+MAGIC = b'VMOINST1'
+# The header consists of MAGIC, the number of systems, the number of
+# travelers, the number of destinations (of all travelers together) and the
+# SHA-256 hash of the rest of the file.
+HEADER = struct.Struct('<8sQQQ32s')
+
+
+# This function writes the missions, coordinates and distances of
+# < datagrabber > (a DataGrabber instance) into the instance file < path >.
+# Returns the hash of the content (as hex string).
+def compile_instance(datagrabber, path):
+	names = [name.encode('utf-8') for name in datagrabber.system_names]
+	name_offsets = np.cumsum([0] + [len(name) for name in names], dtype = '<u8')
+
+	ids = datagrabber.system_ids
+	destinations = np.array([ids[x] for traveler in datagrabber.travelers \
+											for x in traveler], dtype = '<u8')
+	traveler_offsets = np.cumsum([0] + [len(x) for x in datagrabber.travelers], dtype = '<u8')
+
+	content = b''.join([np.ascontiguousarray(datagrabber.distance_matrix, dtype = '<f8').tobytes(), \
+				np.ascontiguousarray(datagrabber.coordinates, dtype = '<f8').tobytes(), \
+				name_offsets.tobytes(), traveler_offsets.tobytes(), \
+				destinations.tobytes(), b''.join(names)])
+	content_hash = sha256(content).digest()
+
+	header = HEADER.pack(MAGIC, len(names), len(datagrabber.travelers), \
+											len(destinations), content_hash)
+
+	# The file is replaced at once (like the checkpoint file, see
+	# class_checkpoint.py). Thus, a process that reads it never sees a
+	# half-written file.
+	temporary_file = path + '.tmp'
+	with open(temporary_file, 'wb') as f:
+		f.write(header)
+		f.write(content)
+	os.replace(temporary_file, path)
+
+	return content_hash.hex()
+
+
+# This class does the same as class DataGrabber, except that it takes
+# everything from an instance file. Thus, neither the mission file nor EDSM
+# is needed and nothing needs to be calculated. The file is memory-mapped.
+# Hence, the distance matrix is never copied in memory.
+class InstanceFile(cd.DataGrabber):
+	# < path > is the complete path to the instance file (incl. filename and
+	# extension).
+	# < verify > is True if the hash in the header shall be compared with
+	# the content (to recognize a damaged file). This reads the whole file.
+	def __init__(self, path, verify = True):
+		self.verify = verify
+		# The hash of the content (as hex string). It is the same for the
+		# same missions and coordinates. Will be set in _get_missions().
+		self.content_hash = None
+
+		cd.DataGrabber.__init__(self, path)
+
+
+	# This method reads the header and the missions. The names of the
+	# systems are needed for the latter and are thus read here, too.
+	def _get_missions(self):
+		with open(self.mission_file, 'rb') as f:
+			magic, number_of_systems, number_of_travelers, number_of_destinations, \
+								content_hash = HEADER.unpack(f.read(HEADER.size))
+
+		if magic != MAGIC:
+			raise ValueError("{} is not an instance file.".format(self.mission_file))
+
+		self.data = np.memmap(self.mission_file, dtype = np.uint8, mode = 'r')
+
+		if self.verify and sha256(self.data[HEADER.size:]).digest() != content_hash:
+			raise ValueError("{} is damaged.".format(self.mission_file))
+
+		self.content_hash = content_hash.hex()
+
+		offset = HEADER.size
+		self.distance_matrix = self._part(offset, '<f8', (number_of_systems, number_of_systems))
+		offset += self.distance_matrix.nbytes
+		self.coordinates = self._part(offset, '<f8', (number_of_systems, 3))
+		offset += self.coordinates.nbytes
+		name_offsets = self._part(offset, '<u8', (number_of_systems + 1, ))
+		offset += name_offsets.nbytes
+		traveler_offsets = self._part(offset, '<u8', (number_of_travelers + 1, ))
+		offset += traveler_offsets.nbytes
+		destinations = self._part(offset, '<u8', (number_of_destinations, ))
+		offset += destinations.nbytes
+
+		names = self.data[offset:].tobytes()
+		name_offsets = name_offsets.tolist()
+		self.system_names = [names[name_offsets[i]:name_offsets[i + 1]].decode('utf-8') \
+												for i in range(number_of_systems)]
+		self.system_ids = {name: i for i, name in enumerate(self.system_names)}
+
+		destinations = destinations.tolist()
+		traveler_offsets = traveler_offsets.tolist()
+		self.origin = self.system_names[0]
+		self.travelers = [[self.system_names[x] for x in \
+						destinations[traveler_offsets[i]:traveler_offsets[i + 1]]] \
+												for i in range(number_of_travelers)]
+
+
+	# The coordinates were read in _get_missions().
+	def _get_coordinates(self):
+		pass
+
+
+	# Dito for the distances.
+	def _get_distances(self):
+		pass
+
+
+	# This method returns the part of the file that starts at < offset >
+	# (in bytes) as numpy array with the data type < dtype > and < shape >.
+	def _part(self, offset, dtype, shape):
+		return np.ndarray(shape, dtype = dtype, buffer = self.data, offset = offset)
@@ -0,0 +1,161 @@
+#    "class_lowerbound" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that calculates a
+# lower bound for the length of the shortest route: no route can be shorter
+# than this. The methods that don't search through all possible routes
+# (restarts, simulated annealing etc.) never know if their best route is the
+# shortest one. With the lower bound it is at least known how much longer
+# it can be at most (the "gap", see class Routefinder).
+
+
+from time import time
+import numpy as np
+
+
+# This class is instantiated in class Routefinder.
+class LowerBound(object):
+	# < routefinder > is the class Routefinder instance that contains the
+	# missions and the distances.
+	def __init__(self, routefinder):
+		self.routefinder = routefinder
+		self.distance_matrix = routefinder.distance_matrix
+
+
+	# This method returns the lower bound. It is the largest one of:
+	# - the bounds of _extend_route() of class Routefinder for the start of
+	#   the route (the longest list of any traveler and the sum of the
+	#   shortest ways into all systems that need to be visited) and
+	# - the bound of _held_karp().
+	# < upper_bound > is the length of a known route (e.g. of the best route
+	# so far). It just makes _held_karp() faster. < maximum_time > is the
+	# maximum time (in seconds) _held_karp() may use.
+	def value(self, upper_bound, maximum_time = 1.0):
+		routefinder = self.routefinder
+		chains = routefinder.chains
+		distance_table = routefinder.distance_table
+		start = routefinder.start
+
+		systems = set([x for chain in chains for x in chain])
+		if not systems:
+			return distance_table[start][0]
+
+		bound = 0.0
+		for chain, tail in zip(chains, routefinder._tails(chains)):
+			if chain:
+				bound = max(bound, distance_table[start][chain[0]] + tail[0])
+
+		# The route always ends with a flight into origin (even if it starts 
+		# there).
+		ways_in = sum([routefinder.shortest_way_in[x] for x in systems - set([start, 0])])
+		ways_in += routefinder.shortest_way_in[0]
+		bound = max(bound, ways_in)
+
+		return max(bound, self._held_karp(systems, upper_bound, maximum_time))
+
+
+	# The route goes from the start system through all < systems > to
+	# origin. Since the distances are straight lines, visiting a system
+	# several times never makes a route shorter. Hence, no route can be
+	# shorter than the shortest path that visits each of these systems
+	# exactly once (ignoring the order of the destinations of the travelers).
+	# Each such path is a tree in which the start system and origin are
+	# connected to ONE other system and all others to TWO. Hence, the
+	# shortest tree (which is easy to find) can't be longer. Adding
+	# "penalties" to the distances that make systems with too many
+	# connections more expensive and ones with too few cheaper gives
+	# different trees that are all still a lower bound. The penalties are
+	# adjusted until the tree is (almost) such a path (Held and Karp).
+	# < upper_bound > and < maximum_time > are the same as for value().
+	def _held_karp(self, systems, upper_bound, maximum_time):
+		start_time = time()
+		start = self.routefinder.start
+
+		# The start system first and origin last. If the route starts in
+		# origin, origin is both of them (and can't be connected to itself).
+		nodes = [start] + sorted(systems - set([start, 0])) + [0]
+		if len(nodes) < 3:
+			return 0.0
+
+		weights = self.distance_matrix[np.ix_(nodes, nodes)].copy()
+		if start == 0:
+			weights[0, -1] = weights[-1, 0] = np.inf
+
+		# How many connections each system has in such a path.
+		wanted_degrees = np.full(len(nodes), 2)
+		wanted_degrees[0] = wanted_degrees[-1] = 1
+
+		penalties = np.zeros(len(nodes))
+		best_bound = 0.0
+		# How large the change of the penalties is. It is halved if the
+		# bound didn't get better for a while.
+		step_factor = 2.0
+		without_improvement = 0
+
+		for iteration in range(1000):
+			if time() - start_time > maximum_time:
+				break
+
+			length, degrees = self._shortest_tree(weights + penalties[:, None] \
+																+ penalties[None, :])
+			bound = length - (wanted_degrees * penalties).sum()
+
+			if bound > best_bound + 1e-9:
+				best_bound = bound
+				without_improvement = 0
+			else:
+				without_improvement += 1
+				if without_improvement >= 10:
+					step_factor /= 2.0
+					without_improvement = 0
+
+			difference = degrees - wanted_degrees
+			squares = (difference * difference).sum()
+			# The tree IS such a path.
+			if squares == 0 or step_factor < 1e-4:
+				break
+
+			penalties += step_factor * max(upper_bound - bound, 0.0) / squares * difference
+
+		return best_bound
+
+
+	# This method returns the length of the shortest tree that connects all
+	# systems with the distances < weights > (a numpy array, Prim's
+	# algorithm) and how many connections each system has in it.
+	def _shortest_tree(self, weights):
+		number_of_nodes = len(weights)
+		in_tree = np.zeros(number_of_nodes, dtype = bool)
+		in_tree[0] = True
+		closest = weights[0].copy()
+		parent = np.zeros(number_of_nodes, dtype = np.int64)
+		degrees = np.zeros(number_of_nodes, dtype = np.int64)
+		length = 0.0
+
+		for x in range(number_of_nodes - 1):
+			node = np.argmin(np.where(in_tree, np.inf, closest))
+			length += closest[node]
+			degrees[node] += 1
+			degrees[parent[node]] += 1
+			in_tree[node] = True
+
+			closer = weights[node] < closest
+			closest = np.where(closer, weights[node], closest)
+			parent = np.where(closer, node, parent)
+
+		return length, degrees
@@ -0,0 +1,104 @@
+#    "class_missiongenerator" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that makes up
+# missions and the coordinates of their systems. It is used instead of
+# class DataGrabber to test and benchmark class Routefinder without a
+# mission file and without asking EDSM.net for coordinates.
+
+
+import random
+
+import class_datagrabber as cd
+
+
+# This class does the same as class DataGrabber, except that the missions
+# and the coordinates are randomly generated. The same < seed > results
+# always in the same missions and coordinates.
+class MissionGenerator(cd.DataGrabber):
+	# < seed > is for the random number generator.
+	# < number_of_travelers > is, well, the number of travelers.
+	# < chain_lengths > is a tuple (minimum, maximum) for the number of
+	# destinations of each traveler. Each traveler gets a random number of
+	# destinations in between (including both).
+	# < number_of_systems > is the number of different destinations the
+	# travelers choose from. The smaller this is compared to the total number
+	# of destinations the more travelers want to go to the same systems.
+	# < size > is the edge length (in ly) of the cube the systems are in.
+	def __init__(self, seed, number_of_travelers, chain_lengths, number_of_systems, \
+																	size = 200.0):
+		self.seed = seed
+		self.number_of_travelers = number_of_travelers
+		self.chain_lengths = chain_lengths
+		self.number_of_systems = number_of_systems
+		self.size = size
+		self.random = random.Random(seed)
+
+		cd.DataGrabber.__init__(self, None)
+
+
+	# This method makes up the origin and the destinations of all travelers.
+	# A traveler never wants to go to the same system twice in a row.
+	def _get_missions(self):
+		self.origin = 'Origin {}'.format(self.seed)
+		systems = ['System {}-{}'.format(self.seed, i) for i in range(self.number_of_systems)]
+
+		for _ in range(self.number_of_travelers):
+			number_of_destinations = self.random.randint(*self.chain_lengths)
+			destinations = []
+
+			while len(destinations) < number_of_destinations:
+				destination = self.random.choice(systems)
+				if not destinations or destinations[-1] != destination:
+					destinations.append(destination)
+
+			self.travelers.append(destinations)
+
+
+	# This method makes up the coordinates of all systems in < names >.
+	def _get_remote_coordinates(self, names):
+		coordinates = {}
+
+		for name in names:
+			coordinates[name] = {'x': self.random.uniform(0, self.size), \
+								'y': self.random.uniform(0, self.size), \
+								'z': self.random.uniform(0, self.size)}
+
+		return coordinates
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
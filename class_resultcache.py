@@ -0,0 +1,117 @@
+#    "class_resultcache" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that stores the
+# routes that were found on disk.
+# The same missions are offered again and again (to different commanders and
+# on different days). Hence, there is no need to search for the route again
+# if it is known to be the shortest one. If it isn't, it is still a very
+# good starting point for the next search. The routes are stored in a small
+# SQLite database (like the coordinates, see class_coordinatecache.py).
+
+
+from hashlib import sha256
+from time import time
+import sqlite3
+import json
+import os
+
+
+# This function returns a string that is the same for the same missions:
+# the same < origin >, the same system the route starts in (< start >) and
+# the same destinations of the travelers (< travelers >, a list of lists of
+# names). The order of the travelers doesn't matter.
+def missions_key(origin, start, travelers):
+	content = [origin, start, sorted(travelers)]
+
+	return sha256(json.dumps(content).encode()).hexdigest()
+
+
+# This class stores and looks up routes. It is instantiated in class
+# Routefinder.
+class ResultCache(object):
+	# < path > is the complete path to the database file (incl. filename and
+	# extension). It is created if it doesn't exist.
+	# < maximum_entries > is the number of routes that are kept. If there are
+	# more, the ones that weren't used for the longest time are deleted.
+	def __init__(self, path, maximum_entries = 1000):
+		self.path = path
+		self.maximum_entries = maximum_entries
+
+		directory = os.path.dirname(os.path.abspath(path))
+		if not os.path.isdir(directory):
+			os.makedirs(directory)
+
+		self.connection = sqlite3.connect(path)
+		# < route > is a list of names as JSON. < solver > and
+		# < maximum_time > are how the route was found. < last_used > is a
+		# value of time().
+		self.connection.execute("""CREATE TABLE IF NOT EXISTS results (
+									key TEXT PRIMARY KEY,
+									route TEXT NOT NULL,
+									length REAL NOT NULL,
+									optimal INTEGER NOT NULL,
+									solver TEXT,
+									maximum_time REAL,
+									last_used REAL NOT NULL)""")
+		self.connection.commit()
+
+
+	# This method returns a dict with the keys 'route', 'length' and
+	# 'optimal' for < key > (see missions_key()) or None if there is no
+	# route for it in the cache.
+	def get(self, key):
+		query = "SELECT route, length, optimal FROM results WHERE key = ?"
+		row = self.connection.execute(query, (key, )).fetchone()
+
+		if row is None:
+			return None
+
+		self.connection.execute("UPDATE results SET last_used = ? WHERE key = ?", \
+																(time(), key))
+		self.connection.commit()
+
+		return {'route': json.loads(row[0]), 'length': row[1], 'optimal': bool(row[2])}
+
+
+	# This method stores < route > (a list of names) with its < length > for
+	# < key > (see missions_key()). < optimal > is True if it is proven that
+	# it is the shortest route. A route that is already in the cache is
+	# just replaced if the new one is better.
+	def put(self, key, route, length, optimal, solver = None, maximum_time = None):
+		known = self.get(key)
+
+		if known is not None and (known['optimal'] or known['length'] <= length) \
+							and not (optimal and known['length'] >= length):
+			return
+
+		query = """INSERT OR REPLACE INTO results (key, route, length, optimal, solver,
+						maximum_time, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)"""
+		self.connection.execute(query, (key, json.dumps(route), length, int(optimal), \
+												solver, maximum_time, time()))
+
+		# Delete the routes that weren't used for the longest time.
+		query = """DELETE FROM results WHERE key NOT IN (SELECT key FROM results
+						ORDER BY last_used DESC LIMIT ?)"""
+		self.connection.execute(query, (self.maximum_entries, ))
+		self.connection.commit()
+
+
+	# This method closes the connection to the database file.
+	def close(self):
+		self.connection.close()
@@ -24,10 +24,21 @@
 # the order in the list.
 
 
-from copy import deepcopy
 from time import time
-from math import factorial
-from itertools import permutations
+from math import inf
+from collections import OrderedDict
+from array import array
+import multiprocessing
+import threading
+import random
+import queue
+import numpy as np
+
+import class_annealer as ca
+import class_genetic as cg
+import class_lowerbound as clb
+import class_resultcache as crc
+import class_searchstats as css
 
 # The object that contains all methods that are necessary to determine a
 # route.
@@ -38,20 +49,132 @@ class Routefinder(object):
 	# an optimal solution. If this time is exceeded the best solution so far 
 	# will be used. Needs to be in seconds. Default is 123 seconds but can
 	# be provided by the user.
-	def __init__(self, datagrabber, maximum_allowed_time):
+	# < workers > is the number of processes the recursive search is split 
+	# over (see _find_parallel_solution()). Default is 1, which means that 
+	# everything happens in this process.
+	# < solver > is the method used to find the route. 'auto' (the default) 
+	# calculates the exact solution if possible and a good enough one 
+	# otherwise (see _do_all()). 'annealing' uses simulated annealing 
+	# (see class_annealer.py) which is much better for MANY destinations.
+	# 'beam' keeps just the best partial routes while it goes through the 
+	# destinations (see _find_beam_solution()).
+	# 'genetic' uses a genetic algorithm (see class_genetic.py), with 
+	# < workers > > 1 one population per process.
+	# 'portfolio' runs several of the methods at the same time in separate 
+	# processes (see _race_solvers()).
+	# The other methods are mainly meant for testing and benchmarking: 
+	# 'dynamic' (_find_dynamic_programming_solution(), if it is possible at 
+	# all), 'recursive' (_find_exact_solution()) and 'restarts' 
+	# (_find_good_enough_solution()) use just the respective method.
+	# < start > is the name of the system the route starts in. Default (None)
+	# is origin. It is different when part of the route was already flown
+	# (see replan()).
+	# < progress > is a list with the number of destinations each traveler
+	# has already visited. Default (None) is nothing.
+	# < incumbent > is a route (a list of names that starts with < start >)
+	# that is used as the first best route (see _use_incumbent()). It
+	# doesn't need to be complete or to fit the missions exactly.
+	# < checkpoint > is a class Checkpoint instance (see class_checkpoint.py)
+	# that writes the state of the search to a file from time to time and
+	# may contain the state of an earlier search that shall be continued.
+	# Default (None) is nothing of this.
+	# < result_cache_file > is the complete path to the file in which the 
+	# routes that were found are stored (see class_resultcache.py). If None, 
+	# the route is always searched for from scratch.
+	# < callback > is a function that is called with the route (a list of 
+	# names) and its length each time a better route is found. Default 
+	# (None) is nothing.
+	# < cancel_event > is a threading.Event (or anything else with an 
+	# is_set() method). The search stops as soon as it is set (see 
+	# cancel()). Default (None) is a new threading.Event.
+	# < beam_width > is the number of partial routes 'beam' keeps. More 
+	# find better routes but need proportionally more time and memory.
+	# < population_size > is the number of routes in the population of 
+	# 'genetic' (in each process).
+	# < gap > is the fraction (e.g. 0.02 for 2 %) by which the best route may 
+	# at most be longer than the shortest route to stop the search early 
+	# (see _check_gap()). Default (None) is to search until 
+	# < maximum_allowed_time > is used up.
+	# < solve > is False if the route shall NOT be searched for right away. 
+	# solve() or improvements() need to be called afterwards. This makes it 
+	# possible to e.g. show each better route while the search is running.
+	def __init__(self, datagrabber, maximum_allowed_time, workers = 1, \
+						solver = 'auto', start = None, progress = None, incumbent = None, \
+						checkpoint = None, result_cache_file = None, callback = None, \
+						cancel_event = None, beam_width = 1000, population_size = 200, \
+						gap = None, solve = True):
+		# The complete lists of destinations of all travelers (incl. the ones
+		# that were already visited) and ...
+		self.all_travelers = datagrabber.travelers
+		# ... how many of them each traveler has already visited.
+		self.progress = progress if progress is not None else [0] * len(self.all_travelers)
 		# The list that contains the lists that contain the destinations for
-		# all travelers in the correct order.
-		self.travelers = datagrabber.travelers
-		# The dict that contains all destinations as main keys and sub-dicts as
-		# values. Said sub-dict again contains each destination as a sub-key and 
-		# the values of the  sub-dict are the distances between the main-key 
-		# destination and the sub-key destination.
-		self.distances = datagrabber.distances
+		# all travelers in the correct order. Just the ones that still need to
+		# be visited.
+		self.travelers = [traveler[visited:] for traveler, visited in \
+										zip(self.all_travelers, self.progress)]
+		# The numpy array with the distances between all systems. 
+		# < self.distance_matrix[i, j] > is the distance between the systems 
+		# with the ids i and j.
+		self.distance_matrix = datagrabber.distance_matrix
 		# It's handy to have the origin (or home location) separate.
 		self.origin = datagrabber.origin
 
+		# Some numbers about the run (see class_searchstats.py). The numbers 
+		# are collected in the attributes of this class during the search 
+		# (updating the attributes of another object for every node would 
+		# slow the search down) and copied to it in _finish_stats().
+		self.stats = css.SearchStats()
+		self.stats.solver = solver
+		self.stats.phase_times.update(datagrabber.phase_times)
+		preparation_start_time = time()
+
+		# The search methods work with integer ids instead of system names 
+		# because looking up a value in a list by its index is much faster 
+		# than two dict-lookups with strings.
+		# < self.names[i] > is the name of the system with id i. Origin has 
+		# id 0.
+		self.names = datagrabber.system_names
+		# The inverse of < self.names >.
+		self.ids = datagrabber.system_ids
+		# The id of the system the route starts in. All routes end in origin.
+		self.start = 0 if start is None else self.ids[start]
+		# Like < self.travelers > just with ids instead of names. Will be set 
+		# in _assign_ids().
+		self.chains = []
+		# < self.distance_table[i][j] > is the same as 
+		# < self.distance_matrix[i, j] > just as nested lists. Indexing numpy 
+		# arrays element by element in pure python loops (as in the search 
+		# methods) is slower than indexing lists and returns numpy floats 
+		# which are slower to add up.
+		self.distance_table = []
+		self._assign_ids()
+		self.stats.add_phase('preparation', time() - preparation_start_time)
+
 		# To be able to measure how much time the search process needed so far.
 		self.start_time = time()
+		# < self.start_time > is reset for each order of travelers in 
+		# _find_good_enough_solution(). This isn't.
+		self.creation_time = time()
+		# How many seconds after < self.creation_time > the first route was 
+		# found. None until then.
+		self.first_record_time = None
+		# Calling time() for every node of _find_best_route() would need a 
+		# considerable part of the process time. Hence, the time is just 
+		# checked every < self.time_check_interval > nodes. This counts them.
+		# The other methods count their steps in here, too (the number of 
+		# situations in _find_dynamic_programming_solution() and the number of 
+		# tried changes in class_annealer.py).
+		self.nodes = 0
+		self.time_check_interval = 1024
+		# The number of nodes that were NOT searched further because they 
+		# couldn't lead to a shorter route than the best one so far.
+		self.pruned = 0
+		# Why the search ended before it went through all possibilities. None 
+		# if it didn't. See class_searchstats.py.
+		self.abort_reason = None
+		# True if the best route is proven to be the shortest possible route.
+		self.optimal = False
 		# The maximum time the user is willing to wait for a solution.
 		self.maximum_allowed_time = maximum_allowed_time
 		# A really high default value to make sure that any route is always
@@ -65,10 +188,270 @@ class Routefinder(object):
 		# The length of the route stored in here corresponds is 
 		# < self.record_length >. The best route will be presented to the user.
 		self.record_path = None
+		# The dynamic programming solver (see _find_dynamic_programming_solution())
+		# needs two tables with one entry per combination of "how far along 
+		# each traveler's list" and "where am I right now". Above this number
+		# of entries the tables need too much memory (each entry needs 16 
+		# bytes) and the old recursive search is used instead.
+		self.maximum_table_size = 4000000
+		# With up to this many destinations (EXCLUDING origin) the recursive 
+		# search tries to find the exact solution. See _do_all().
+		self.maximum_exact_destinations = 14
+		# The recursive search remembers the shortest way to up to this many
+		# situations (see _find_best_route()). Each entry needs roughly 100
+		# bytes.
+		self.maximum_transpositions = 500000
+		# Said situations. Will be filled in _find_best_route().
+		self.transpositions = OrderedDict()
+		# A dict with the integers that encode the progress of all travelers 
+		# as keys and the possible next points as values (see _candidates()). 
+		# At most < self.maximum_transpositions > are kept, too.
+		self.all_candidates = {}
+		# The shortest time slice of the restarts in 
+		# _find_good_enough_solution() as fraction of the maximum allowed 
+		# time. Longer slices found more often the shortest route during 
+		# testing, shorter ones try more orders of travelers.
+		self.restart_time_fraction = 0.02
+		# The random number generator for the orders of travelers of said 
+		# restarts and its seed (which is stored in checkpoints).
+		self.seed = random.randrange(1 << 32)
+		self.random = random.Random(self.seed)
+		# See above.
+		self.checkpoint = checkpoint
+		self.result_cache_file = result_cache_file
+		# The path (a list of ids) the recursive search of an earlier run 
+		# was working on when the checkpoint was written (see _resume()) 
+		# and ...
+		self.resume_frontier = None
+		# ... the same while _extend_route() is on its way back to it. None 
+		# otherwise.
+		self.resume_path = None
+		# The number of processes for the recursive search.
+		self.workers = workers
+		# See above.
+		self.beam_width = beam_width
+		self.population_size = population_size
+		# The method used to find the route. See above.
+		self.solver = solver
+		# The route found by _find_greedy_route() as list of ids (WITHOUT the
+		# way back to origin).
+		self.greedy_path = None
+		# The route that is used as first best route. See above.
+		self.incumbent = incumbent
+		# If the search runs in several processes, this is a 
+		# multiprocessing.Value that contains the shortest distance found by 
+		# ANY of them. It is None otherwise. See _find_parallel_solution().
+		self.shared_record_length = None
+		# If the methods race each other (see _race_solvers()), this is a 
+		# multiprocessing.Array with the ids of the best route found by ANY 
+		# of the processes (followed by -1). It is None otherwise.
+		self.shared_record_path = None
+		# If the search runs in several processes, this is a 
+		# multiprocessing.Value that is set to 1 to tell all of them to stop 
+		# (see _stop_requested()). It is None otherwise.
+		self.shared_stop = None
+		# How long (in seconds) the worker processes get to return their 
+		# results after they were told to stop. Only after this time they are 
+		# terminated (see _close_pool()).
+		self.shutdown_grace_time = 5.0
+		# No route can be shorter than this (see _find_lower_bound()). 0.0 
+		# until it is known.
+		self.lower_bound = 0.0
+		# See above.
+		self.gap_tolerance = gap
+		# True if the best route is at most < self.gap_tolerance > longer 
+		# than the shortest route.
+		self.good_enough = False
+		# See above.
+		self.callback = callback
+		self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+
+		if solve:
+			self.solve()
+
+
+	# This method finds the best route. < deadline > is a value of time() at 
+	# which the search stops even if < self.maximum_allowed_time > isn't 
+	# used up yet. Default (None) is no such point in time.
+	# It is called in __init__() unless < solve > is False there.
+	def solve(self, deadline = None):
+		self.start_time = time()
+		self.creation_time = time()
+
+		if deadline is not None:
+			self.maximum_allowed_time = min(self.maximum_allowed_time, \
+												max(0.0, deadline - time()))
 
 		# Well, this just does everything to find the best route.
 		self._do_all()
 
+		if self.cancel_event.is_set() and not self.optimal:
+			self.abort_reason = 'cancelled'
+		elif self.good_enough and not self.optimal:
+			self.abort_reason = 'gap'
+
+		self._finish_stats()
+
+		# There is nothing left to continue but the result shall be known 
+		# when resuming.
+		if self.checkpoint is not None and self.optimal:
+			self.checkpoint.save(self)
+
+		if self.result_cache_file is not None:
+			self._store_result()
+
+
+	# This method finds the best route like solve() and yields a tuple 
+	# (route, length) for each better route as soon as it is found. The 
+	# route is a list of names. The search runs in a separate thread. If 
+	# the loop over the yielded routes is left early (e.g. with break), the 
+	# search is cancelled. If the search fails, the exception is raised 
+	# after the last route.
+	# < deadline > is the same as for solve().
+	def improvements(self, deadline = None):
+		routes = queue.Queue()
+		callback = self.callback
+
+		# The original callback (if any) shall still be called.
+		def report(route, length):
+			routes.put((route, length))
+			if callback is not None:
+				callback(route, length)
+
+		# None tells the loop below that the search is over. An exception 
+		# can't leave the thread and is thus kept for the loop.
+		failure = None
+		def search():
+			nonlocal failure
+			try:
+				self.solve(deadline)
+			except BaseException as error:
+				failure = error
+			finally:
+				routes.put(None)
+
+		self.callback = report
+		thread = threading.Thread(target = search)
+		thread.start()
+
+		try:
+			while True:
+				improvement = routes.get()
+				if improvement is None:
+					break
+
+				yield improvement
+		finally:
+			if thread.is_alive():
+				self.cancel()
+			thread.join()
+			self.callback = callback
+
+		if failure is not None:
+			raise failure
+
+
+	# This method stops the search (e.g. from another thread). The best 
+	# route so far is kept.
+	def cancel(self):
+		self.cancel_event.set()
+
+
+	# This method returns True if the search shall stop: either because 
+	# < self.maximum_allowed_time > (counted from < self.start_time >) is 
+	# used up or because of _stop_requested().
+	def _time_is_up(self):
+		return self._stop_requested() or \
+						(time() - self.start_time) > self.maximum_allowed_time
+
+
+	# This method returns True if the search shall stop no matter how much 
+	# time is left: because it was cancelled, because the best route is 
+	# good enough (see _check_gap()) or because the process that started 
+	# this worker process said so.
+	def _stop_requested(self):
+		if self.shared_stop is not None and self.shared_stop.value:
+			return True
+
+		return self.good_enough or self.cancel_event.is_set()
+
+
+	# This method returns the fraction by which the best route is at most 
+	# longer than the shortest route (see _find_lower_bound()). None if there 
+	# is no route yet.
+	def gap(self):
+		if self.record_path is None:
+			return None
+
+		# This includes routes with length 0 (e.g. without missions).
+		if self.record_length <= self.lower_bound:
+			return 0.0
+
+		return (self.record_length - self.lower_bound) / self.record_length
+
+
+	# This method checks if the best route is good enough to stop the search 
+	# (see < gap > in __init__()). If it is as short as the lower bound, it 
+	# is the shortest route (and so is a route with length 0).
+	def _check_gap(self):
+		if self.record_length <= self.lower_bound:
+			self.optimal = True
+			self.good_enough = True
+			return
+
+		if self.lower_bound <= 0.0:
+			return
+
+		gap = (self.record_length - self.lower_bound) / self.record_length
+
+		if gap <= 1e-9:
+			self.optimal = True
+			self.good_enough = True
+		elif self.gap_tolerance is not None and gap <= self.gap_tolerance:
+			self.good_enough = True
+
+
+	# This method calculates < self.lower_bound > (see class_lowerbound.py). 
+	# It needs a small part of the maximum allowed time.
+	def _find_lower_bound(self):
+		lower_bound = clb.LowerBound(self)
+		maximum_time = min(1.0, 0.05 * self.maximum_allowed_time)
+		self.lower_bound = lower_bound.value(self.record_length, maximum_time)
+
+		this = "No route can be shorter than {0:.2f} ly. ".format(self.lower_bound)
+		that = "The best route so far is at most {0:.1f} % longer.\n".format(100 * self.gap())
+		print(this + that)
+
+		self._check_gap()
+
+
+	# The callback and the event can't be sent along to the worker processes 
+	# of _find_parallel_solution() (on systems that don't fork them). Neither 
+	# of them is needed there.
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		state['callback'] = None
+		del state['cancel_event']
+
+		return state
+
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.cancel_event = threading.Event()
+
+
+	# This method copies the numbers collected during the search into 
+	# < self.stats >.
+	def _finish_stats(self):
+		self.stats.add_phase('search', time() - self.creation_time)
+		self.stats.nodes = self.nodes
+		self.stats.pruned = self.pruned
+		self.stats.optimal = self.optimal
+		self.stats.abort_reason = self.abort_reason
+		self.stats.lower_bound = self.lower_bound
+		self.stats.gap = 0.0 if self.optimal else self.gap()
+
 
 	# This is the method that calls all methods that call methods (etc. pp.)
 	# to find the best solution for all missions. It exists mainly to keep 
@@ -78,12 +461,82 @@ class Routefinder(object):
 		# minimum amount of points in the route.
 		# This does NOT include origin.
 		minimum_destinations = len(set([x for traveler in self.travelers for x in traveler]))
+		solver = self.solver
+
+		# A good route that is already known makes the pruning in
+		# _extend_route() effective right from the start.
+		if self.incumbent is not None:
+			self._use_incumbent(self.incumbent)
+
+		# The same missions might have been solved before.
+		if self.result_cache_file is not None:
+			self._use_cached_result()
+
+			if self.optimal:
+				return
+
+		if self.checkpoint is not None:
+			self._resume()
+
+			if self.optimal:
+				return
 
-		# With 12 destinations (EXCLUDING the start and end (origin)) 
-		# calculating the  exact solution takes approx. one minute. More than 
-		# that needs an impractical amount of time. 12 was determined 
-		# empirically. 
-		if minimum_destinations <= 12:
+		# The processes of the worker pools of class_batch.py and 
+		# class_solverdaemon.py can't start processes of their own.
+		if solver == 'portfolio' and multiprocessing.current_process().daemon:
+			solver = 'auto'
+
+		if solver == 'portfolio':
+			self._find_greedy_route()
+			self._find_lower_bound()
+			if self.good_enough:
+				return
+
+			self._race_solvers()
+			return
+
+		# The dynamic programming solver finds the exact solution and its 
+		# process time does NOT grow factorial. It's the first choice as long
+		# as its tables fit into memory.
+		if solver in ('auto', 'dynamic') and \
+				self._size_of_dynamic_programming_table() <= self.maximum_table_size:
+			aborted = self._find_dynamic_programming_solution()
+
+			if not aborted or self.cancel_event.is_set():
+				return
+
+		# A good first route makes the pruning in _extend_route() effective 
+		# right from the start.
+		self._find_greedy_route()
+
+		# The methods below may not know if their best route is the shortest 
+		# one. But with the lower bound it is known how good it is at least.
+		self._find_lower_bound()
+		if self.good_enough:
+			return
+
+		if solver == 'annealing':
+			self._find_annealing_solution()
+			return
+
+		if solver == 'beam':
+			self._find_beam_solution()
+			return
+
+		if solver == 'genetic':
+			self._find_genetic_solution()
+			return
+
+		# With 14 destinations (EXCLUDING the start and end (origin)) 
+		# calculating the exact solution takes usually a few seconds (it was 
+		# 12 and approx. one minute before the lower bounds in 
+		# _extend_route() existed). More than that needs an impractical 
+		# amount of time. 14 was determined empirically. 
+		if solver == 'recursive':
+			self._find_exact_solution()
+		elif solver == 'restarts':
+			self._find_good_enough_solution()
+		elif minimum_destinations <= self.maximum_exact_destinations:
 			self._find_exact_solution()
 		else:
 			self._find_good_enough_solution()
@@ -97,35 +550,669 @@ class Routefinder(object):
 		that = "the exact solution ... \n"
 		print(this + that)
 
-		# Start and end of the journey are the same. The rest will be 
-		# filled in in _find_best_route().
-		path = [self.origin, self.origin]
-
 		# It is still possible that the search process needs too much time.
 		# Most likely because the user provided a small value for how long
 		# he or she is willing to wait. Hence, the return value of 
 		# _find_best_route() is called < aborted > and ...
-		aborted = self._find_best_route(path, self.travelers)
+		if self.workers > 1:
+			aborted = self._find_parallel_solution([(self.chains, self.maximum_allowed_time)], \
+							4 * self.workers, self.start_time, \
+							self.start_time + self.maximum_allowed_time)
+		else:
+			# Everything before the frontier of a checkpoint was already 
+			# searched through by an earlier run.
+			self.resume_path = self.resume_frontier
+			aborted = self._find_best_route(self.chains)
 
 		# ... if the search process was aborted the user will be told so.
-		if aborted:
+		if not aborted:
+			self.optimal = True
+		elif self.cancel_event.is_set():
+			print("\nThe search was cancelled. The following is the best solution found.")
+		elif self.good_enough:
+			print("\nThe search was stopped because the best route is good enough.")
+		else:
+			self.abort_reason = 'maximum_allowed_time'
 			this = "\nThe search algorithm was aborted because the process "
 			that = "time exceeded {} s. ".format(self.maximum_allowed_time)
 			siht = "The following is the best solution found."
 			print(this + that + siht)
 
 
+	# This method uses simulated annealing to find a good route (see 
+	# class_annealer.py). Contrary to _find_good_enough_solution() it finds a 
+	# good route within the first second even for 50+ destinations and 
+	# improves it during the whole < self.maximum_allowed_time >.
+	def _find_annealing_solution(self):
+		this = "Searching for a good route by simulated annealing for "
+		that = "{} s ... \n".format(self.maximum_allowed_time)
+		print(this + that)
+
+		annealer = ca.Annealer(self)
+		annealer.run(self.start_time, self.maximum_allowed_time)
+
+		# Simulated annealing never knows if it found the shortest route.
+		self.abort_reason = 'maximum_allowed_time'
+
+
+	# This method goes through the destinations breadth-wise: all partial 
+	# routes with one more flight are made from all partial routes at once. 
+	# Just the < self.beam_width > most promising ones (the ones with the 
+	# shortest length plus lower bound for the rest, see _extend_route()) 
+	# are kept for the next flight. Contrary to the depth-first search of 
+	# _find_best_route() a bad first choice can't use up all the time and 
+	# the process time and memory depend just on < self.beam_width > and the 
+	# number of destinations. Good for MANY destinations.
+	# The partial routes are numpy arrays (one row per partial route) and 
+	# all of them are extended by a few array operations instead of a python 
+	# loop per route. Partial routes that end up in the same situation 
+	# (same progress of all travelers, same current system) are merged and 
+	# just the shortest one is kept.
+	# If never more than < self.beam_width > partial routes were left, 
+	# nothing was thrown away and the route is the shortest one.
+	def _find_beam_solution(self):
+		this = "Searching for a good route with a beam of "
+		that = "{} partial routes ... \n".format(self.beam_width)
+		print(this + that)
+
+		chains = self.chains
+		number_of_travelers = len(chains)
+		if sum([len(chain) for chain in chains]) == 0:
+			self.optimal = True
+			return
+
+		distances = self.distance_matrix
+		travelers = np.arange(number_of_travelers)
+		longest = max([len(chain) for chain in chains])
+		# < wanted[i, k] > is the destination of traveler i after k visited 
+		# ones (-1 if there is none) and < tails[i, k] > the respective 
+		# entry of _tails().
+		wanted = np.full((number_of_travelers, longest + 1), -1, dtype = np.int64)
+		tails = np.zeros((number_of_travelers, longest + 1))
+		for i, (chain, tail) in enumerate(zip(chains, self._tails(chains))):
+			wanted[i, :len(chain)] = chain
+			tails[i, :len(tail)] = tail
+		# < earlier[i, k] > is True if traveler k comes before traveler i.
+		earlier = np.tri(number_of_travelers, k = -1, dtype = bool)
+		# See _assign_ids().
+		shortest_way_in = np.array(self.shortest_way_in)
+
+		# Each situation is encoded as integers like in _find_best_route(). 
+		# With many travelers the progress of all of them doesn't fit into 
+		# ONE integer. Hence, < radix[i, g] > is the "value" of the digit of 
+		# traveler i in the integer g (and 0 if it is in a different one).
+		digits = []
+		stride = 1 << 62
+		for i, chain in enumerate(chains):
+			if stride * (len(chain) + 1) >= 1 << 62:
+				digits.append(np.zeros(number_of_travelers, dtype = np.int64))
+				stride = 1
+			digits[-1][i] = stride
+			stride *= len(chain) + 1
+		radix = np.column_stack(digits)
+
+		# One row for each partial route: how far along its list each 
+		# traveler is, the current system, the length so far, the systems 
+		# that were flown to and < pending > and < ways_in > of 
+		# _find_best_route().
+		progress = np.zeros((1, number_of_travelers), dtype = np.int64)
+		currents = np.array([self.start])
+		lengths = np.array([0.0])
+		paths = np.array([[self.start]])
+		pending = np.zeros((1, len(self.names)), dtype = np.int32)
+		for chain in chains:
+			np.add.at(pending[0], chain, 1)
+		ways_in = np.array([shortest_way_in[pending[0] > 0].sum()])
+
+		aborted = False
+		truncated = False
+
+		while len(lengths) > 0:
+			if self._time_is_up():
+				aborted = True
+				break
+
+			# Several travelers may want to go to the same system next. Just 
+			# the first of them makes a new partial route (see _candidates()).
+			next_points = wanted[travelers, progress]
+			same = next_points[:, :, None] == next_points[:, None, :]
+			duplicate = (same & earlier).any(axis = 2)
+			rows, columns = np.nonzero((next_points >= 0) & ~duplicate)
+			points = next_points[rows, columns]
+			self.nodes += len(rows)
+
+			# All travelers that want to go there make progress.
+			advancing = next_points[rows] == points[:, None]
+			advanced = advancing.sum(axis = 1)
+			new_progress = progress[rows] + advancing
+			new_lengths = lengths[rows] + distances[currents[rows], points]
+			still_pending = pending[rows, points] - advanced
+			new_ways_in = ways_in[rows] - np.where(still_pending == 0, shortest_way_in[points], 0.0)
+
+			# The same bounds as in _extend_route().
+			new_next_points = wanted[travelers, new_progress]
+			open_travelers = new_next_points >= 0
+			bounds = np.where(open_travelers, distances[points[:, None], \
+							np.maximum(new_next_points, 0)] + tails[travelers, new_progress], 0.0)
+			bounds = np.maximum(bounds.max(axis = 1), distances[points, 0])
+
+			other_bounds = new_ways_in - np.where(still_pending > 0, shortest_way_in[points], 0.0)
+			origin_pending = pending[rows, 0] - np.where(points == 0, advanced, 0)
+			other_bounds += np.where(origin_pending > 0, 0.0, shortest_way_in[0])
+			bounds = np.maximum(bounds, other_bounds)
+
+			finished = ~open_travelers.any(axis = 1)
+			if finished.any():
+				totals = new_lengths[finished] + distances[points[finished], 0]
+				best = np.argmin(totals)
+				path = paths[rows[finished][best]].tolist() + [int(points[finished][best])]
+				self._new_record(path, float(totals[best]))
+
+			promising = ~finished & (new_lengths + bounds < self.record_length)
+			self.pruned += int((~finished & ~promising).sum())
+			candidates = np.nonzero(promising)[0]
+
+			# Sorted by situation and the shortest partial route of each
+			# situation first. Just this one is kept.
+			situations = np.column_stack([new_progress[candidates] @ radix, \
+														points[candidates]])
+			order = np.lexsort((new_lengths[candidates], ) + tuple(situations.T))
+			situations = situations[order]
+			first = np.ones(len(order), dtype = bool)
+			first[1:] = (situations[1:] != situations[:-1]).any(axis = 1)
+			selected = candidates[order[first]]
+
+			if len(selected) > self.beam_width:
+				truncated = True
+				scores = new_lengths[selected] + bounds[selected]
+				selected = selected[np.argpartition(scores, self.beam_width - 1)[:self.beam_width]]
+
+			progress = new_progress[selected]
+			currents = points[selected]
+			lengths = new_lengths[selected]
+			paths = np.column_stack([paths[rows[selected]], points[selected]])
+			pending = pending[rows[selected]]
+			pending[np.arange(len(selected)), currents] -= advanced[selected].astype(np.int32)
+			ways_in = new_ways_in[selected]
+
+		if aborted:
+			self.abort_reason = 'maximum_allowed_time'
+		elif truncated:
+			self.abort_reason = 'beam_width'
+		else:
+			self.optimal = True
+
+
+	# This method runs the other methods at the same time, each in its own 
+	# process: the dynamic programming solver (if its tables fit into 
+	# memory), the recursive search for the exact solution, the restarts, 
+	# simulated annealing, the beam search and the genetic algorithm. Which 
+	# of them is the best depends on the missions. Before, just one of them was chosen by the
+	# number of destinations (see _do_all()) which was sometimes wrong in
+	# both directions.
+	# All processes know the best route found by ANY of them (in 
+	# < self.shared_record_length > and < self.shared_record_path >). Hence, 
+	# the searches abandon bad paths equally early and the annealing 
+	# continues from this route (see class_annealer.py). The race is over 
+	# as soon as one of the exact methods went through all possibilities 
+	# (which proves that the best route is the shortest one) or 
+	# < self.maximum_allowed_time > is used up.
+	def _race_solvers(self):
+		strategies = ['recursive', 'restarts', 'annealing', 'beam', 'genetic']
+		if self._size_of_dynamic_programming_table() <= self.maximum_table_size:
+			strategies.insert(0, 'dynamic')
+
+		this = "Racing {} at the same time ".format(', '.join(strategies))
+		that = "for up to {} s ... \n".format(self.maximum_allowed_time)
+		print(this + that)
+
+		deadline = self.start_time + self.maximum_allowed_time
+		tasks = [(strategy, deadline) for strategy in strategies]
+		winner = None
+
+		# The other methods are NOT terminated when one of them wins. They are 
+		# told to stop and their results (maybe being sent already) are still 
+		# collected. Terminating a process while it returns its result can 
+		# make the whole pool hang (see _close_pool()).
+		for strategy, optimal, nodes, pruned in \
+						self._run_sharing_record(_race_in_worker, tasks, deadline):
+			self.nodes += nodes
+			self.pruned += pruned
+
+			if optimal and winner is None:
+				winner = strategy
+				self.shared_stop.value = 1
+
+		if winner is not None:
+			self.optimal = True
+			print("\nThe {} search proved that this is the shortest route.".format(winner))
+		else:
+			self.abort_reason = 'maximum_allowed_time'
+
+
+	# This method runs < function > for each of the < tasks > in a worker 
+	# process (one process per task) and yields the results as soon as they 
+	# are there. All processes know the best route found by ANY of them (in 
+	# < self.shared_record_length > and < self.shared_record_path >) and so 
+	# does this one, even while no result comes. The processes are told to 
+	# stop at < deadline > (a value of time()), when the search is cancelled 
+	# or when the loop over the results is left. Their results still come 
+	# in after < deadline > until all of them returned (see _close_pool()).
+	def _run_sharing_record(self, function, tasks, deadline):
+		self.shared_record_length = multiprocessing.Value('d', self.record_length)
+		# The longest route visits each destination once (plus the start 
+		# system) and the -1 at the end.
+		size = sum([len(chain) for chain in self.chains]) + 2
+		self.shared_record_path = multiprocessing.Array('i', size, lock = False)
+		self._write_shared_path([self.ids[x] for x in self.record_path[:-1]])
+		self.shared_stop = multiprocessing.Value('b', 0, lock = False)
+
+		pool = multiprocessing.Pool(len(tasks), initializer = _initialize_worker, \
+							initargs = (self, self.shared_record_length, \
+							self.shared_stop, self.shared_record_path))
+		results = pool.imap_unordered(function, tasks)
+		# When the processes were told to stop. None as long as they weren't.
+		stop_time = None
+
+		try:
+			while True:
+				try:
+					result = results.next(timeout = 0.1)
+				except multiprocessing.TimeoutError:
+					result = None
+				except StopIteration:
+					break
+
+				self._use_shared_record()
+
+				if result is not None:
+					yield result
+
+				if stop_time is None and (time() > deadline or self._stop_requested()):
+					self.shared_stop.value = 1
+					stop_time = time()
+
+				if stop_time is not None and time() - stop_time > self.shutdown_grace_time:
+					break
+		finally:
+			if stop_time is None:
+				stop_time = time()
+
+			self._close_pool(pool, results, stop_time + self.shutdown_grace_time)
+			self._use_shared_record()
+			self.shared_record_length = None
+			self.shared_record_path = None
+			self.shared_stop = None
+
+
+	# This method tells the processes of < pool > to stop and waits until 
+	# all of them returned their < results > (the iterator of 
+	# imap_unordered(), the results are dropped). Terminating the pool while 
+	# a process is still returning its result can make terminate() hang 
+	# forever. Hence, the processes are just terminated if they didn't 
+	# return by < give_up_time > (a value of time()).
+	def _close_pool(self, pool, results, give_up_time):
+		self.shared_stop.value = 1
+		pool.close()
+
+		while time() < give_up_time:
+			try:
+				results.next(timeout = 0.1)
+			except multiprocessing.TimeoutError:
+				continue
+			except StopIteration:
+				pool.join()
+				return
+
+		pool.terminate()
+		pool.join()
+
+
+	# This method writes < path > (a list of ids WITHOUT the way back to 
+	# origin) into < self.shared_record_path >. The lock of 
+	# < self.shared_record_length > needs to be held (or no other process 
+	# may exist yet).
+	def _write_shared_path(self, path):
+		self.shared_record_path[:len(path)] = path
+		self.shared_record_path[len(path)] = -1
+
+
+	# This method returns the best route of all processes of 
+	# _run_sharing_record() (a list of ids WITHOUT the way back to origin) 
+	# and its length or None if there are no such processes.
+	def _shared_record(self):
+		if self.shared_record_path is None:
+			return None
+
+		with self.shared_record_length.get_lock():
+			length = self.shared_record_length.value
+			path = self.shared_record_path[:]
+
+		return path[:path.index(-1)], length
+
+
+	# This method makes the best route of all processes of 
+	# _run_sharing_record() the best route of this process (if it is better).
+	def _use_shared_record(self):
+		path, length = self._shared_record()
+
+		if length < self.record_length:
+			self.record_length = length
+			self.record_path = [self.names[x] for x in path] + [self.origin]
+			self.stats.improvements.append((time() - self.creation_time, length))
+			self._check_gap()
+
+			if self.callback is not None:
+				self.callback(self.record_path, self.record_length)
+
+
+	# This method uses a genetic algorithm to find a good route (see 
+	# class_genetic.py) until < self.maximum_allowed_time > is used up. With 
+	# < self.workers > > 1 each process has its own population ("island"). 
+	# They evolve independently, but the best route of all processes joins 
+	# the other populations from time to time.
+	def _find_genetic_solution(self):
+		this = "Searching for a good route with a genetic algorithm for "
+		that = "{} s ... \n".format(self.maximum_allowed_time)
+		print(this + that)
+
+		if self.workers > 1:
+			deadline = self.start_time + self.maximum_allowed_time
+			tasks = [(self.random.randrange(1 << 32), deadline) for x in range(self.workers)]
+
+			for nodes in self._run_sharing_record(_evolve_in_worker, tasks, deadline):
+				self.nodes += nodes
+		else:
+			genetic = cg.Genetic(self, self.population_size, self.random.randrange(1 << 32))
+			genetic.run(self.start_time, self.maximum_allowed_time)
+
+		# A genetic algorithm never knows if it found the shortest route.
+		self.abort_reason = 'maximum_allowed_time'
+
+
+	# This method fills the attributes that describe the missions with integer
+	# ids instead of system names. See __init__() for details.
+	def _assign_ids(self):
+		self.chains = [[self.ids[x] for x in traveler] for traveler in self.travelers]
+		self.distance_table = self.distance_matrix.tolist()
+
+		# < self.shortest_way_in[i] > is the shortest distance from any 
+		# other system to the system with id i. Used by _extend_route() to 
+		# estimate how much distance still needs to be flown at least.
+		if len(self.names) > 1:
+			ways_in = self.distance_matrix + np.diag(np.full(len(self.names), np.inf))
+			self.shortest_way_in = ways_in.min(axis = 0).tolist()
+		else:
+			self.shortest_way_in = [0.0]
+
+
+	# This method builds a route by always flying to the closest of the 
+	# possible next destinations. The route is usually not too bad and 
+	# it is used as the first best route so that _extend_route() can prune 
+	# bad paths right from the beginning.
+	def _find_greedy_route(self):
+		path = self._complete_greedily([self.start], [0] * len(self.chains))
+
+		self.greedy_path = path
+		self._new_record(path, self._length_of_path([self.names[x] for x in path] + [self.origin]))
+
+
+	# This method appends to < path > (a list of ids) all destinations that
+	# still need to be visited by always flying to the closest of the
+	# possible next destinations. < progress > is how far along its list each
+	# traveler is at the end of < path >. Both are changed in place.
+	# Returns < path >.
+	def _complete_greedily(self, path, progress):
+		while True:
+			distances_from_current = self.distance_table[path[-1]]
+			point = None
+
+			for chain, visited in zip(self.chains, progress):
+				if visited < len(chain):
+					candidate = chain[visited]
+					if point is None or \
+						distances_from_current[candidate] < distances_from_current[point]:
+						point = candidate
+
+			if point is None:
+				break
+
+			path.append(point)
+
+			for i, chain in enumerate(self.chains):
+				if progress[i] < len(chain) and chain[progress[i]] == point:
+					progress[i] += 1
+
+		return path
+
+
+	# This method makes < route > (a list of names, see __init__()) the
+	# first best route. Systems in it that nobody (still) needs to go to are
+	# left out and the destinations that are missing in it are added at the
+	# end (see _complete_greedily()). Hence, the route of a previous run
+	# can be used even if the missions changed in between.
+	def _use_incumbent(self, route):
+		progress = [0] * len(self.chains)
+		path = [self.start]
+
+		for name in route:
+			point = self.ids.get(name)
+			advanced = False
+
+			for i, chain in enumerate(self.chains):
+				if progress[i] < len(chain) and chain[progress[i]] == point:
+					progress[i] += 1
+					advanced = True
+
+			if advanced:
+				path.append(point)
+
+		self._complete_greedily(path, progress)
+		self._new_record(path, self._length_of_path([self.names[x] for x in path] + [self.origin]))
+
+
+	# This method finds a new route after a part of the best route was
+	# already flown and the missions changed in between (some were finished
+	# or cancelled, new travelers were picked up).
+	# < datagrabber > contains ALL missions as they are now (incl. the
+	# destinations that were already visited). Its coordinates come usually
+	# from the cache and thus no time is needed to get them.
+	# < position > is the name of the system I'm in right now. The best route
+	# is assumed to be flown until it got there (the first time).
+	# See __init__() for the other parameters.
+	#
+	# Travelers that are in the old and the new missions (with the same list
+	# of destinations) made the progress the flown part of the route gives
+	# them. New travelers didn't visit anything yet. The rest of the old
+	# route is used as first best route. Since only the remaining
+	# destinations need to be searched through this takes usually just a
+	# fraction of the time of the first run.
+	# If no traveler wants to go to < position > anymore (e.g. because the 
+	# only one who did is finished), it is added to the systems of 
+	# < datagrabber >.
+	#
+	# Returns a new Routefinder instance with the route from < position >
+	# back to origin.
+	def replan(self, datagrabber, position, maximum_allowed_time, workers = 1, \
+																solver = 'auto'):
+		if position not in self.record_path:
+			raise ValueError("{} is not part of the route.".format(position))
+
+		here = self.record_path.index(position)
+		flown = self.record_path[1:here + 1]
+
+		datagrabber.add_system(position)
+
+		# The old travelers that are not yet assigned to a new one.
+		old_travelers = list(range(len(self.all_travelers)))
+
+		progress = []
+		for traveler in datagrabber.travelers:
+			visited = 0
+
+			for i in old_travelers:
+				if self.all_travelers[i] == traveler:
+					old_travelers.remove(i)
+					visited = self.progress[i]
+
+					for name in flown:
+						if visited < len(traveler) and traveler[visited] == name:
+							visited += 1
+					break
+
+			progress.append(visited)
+
+		return Routefinder(datagrabber, maximum_allowed_time, workers, solver, \
+					start = position, progress = progress, \
+					incumbent = self.record_path[here:])
+
+
+	# This method returns the number of entries the tables of 
+	# _find_dynamic_programming_solution() would have.
+	def _size_of_dynamic_programming_table(self):
+		# The tables have an entry for EACH system (see 
+		# _find_dynamic_programming_solution()), not just for the ones that 
+		# still need to be visited (e.g. the start system after replan()).
+		size = len(self.names)
+
+		for traveler in self.travelers:
+			size *= len(traveler) + 1
+
+		return size
+
+
+	# The recursive search in _find_best_route() goes through every possible 
+	# order of destinations. But most of these orders end up in the very same 
+	# situation: all that matters for the rest of the journey is how far along 
+	# each traveler's list I am (the "progress" of each traveler) and in 
+	# which system I am right now. The way I got there is irrelevant, except 
+	# that I want the shortest one. Hence, this method stores just the 
+	# shortest distance for each such situation (Held-Karp style).
+	# 
+	# Each progress vector is encoded as ONE integer (mixed-radix, each 
+	# traveler is a "digit" with < len(traveler) + 1 > possible values). 
+	# Visiting a destination only ever increases the progress of travelers 
+	# and thus the integer. Hence, going through all integers in increasing 
+	# order guarantees that a situation is final before it is used to reach 
+	# the next ones.
+	# 
+	# Contrary to _find_best_route() the process time grows with the number of 
+	# these situations and NOT factorial with the number of destinations.
+	# 
+	# Returns True if it is aborted because the process time is larger than 
+	# < self.maximum_allowed_time > and False otherwise.
+	def _find_dynamic_programming_solution(self):
+		this = "I'll try to calculate the exact solution by keeping track of "
+		that = "the shortest way to each combination of visited destinations ... \n"
+		print(this + that)
+
+		# Integer ids make it possible to use the flat tables below.
+		names = self.names
+		chains = self.chains
+		distances = self.distance_table
+
+		number_of_systems = len(names)
+
+		# < strides > are the "values" of each digit of the mixed-radix number.
+		strides = []
+		number_of_states = 1
+		for chain in chains:
+			strides.append(number_of_states)
+			number_of_states *= len(chain) + 1
+
+		# < cost[state * number_of_systems + system] > is the length of the 
+		# shortest path that leads to this progress and ends in < system >.
+		# < parent > stores the index of the entry it was reached from to be 
+		# able to reconstruct the route in the end.
+		# Nothing is visited yet and I'm in the start system.
+		cost = array('d', [inf]) * (number_of_states * number_of_systems)
+		parent = array('l', [-1]) * (number_of_states * number_of_systems)
+		cost[self.start] = 0.0
+
+		for state in range(number_of_states):
+			self.nodes += 1
+
+			# The time check is not done for every state since it is 
+			# relatively expensive compared to the work done per state.
+			if state % 1024 == 0:
+				if self._time_is_up():
+					this = "\nThe dynamic programming solver was aborted because "
+					that = "the process time exceeded {} s. ".format(self.maximum_allowed_time)
+					siht = "Falling back to the recursive search ..."
+					print(this + that + siht)
+					return True
+
+			# The systems I can be in right now are the ones that were visited 
+			# last for any of the travelers (or origin if nothing was visited).
+			currents = set()
+			# Visiting < next_system > leads to the state < candidates[next_system] >.
+			# Several travelers may want to go to the same system next. All
+			# of them make progress when this system is visited.
+			candidates = {}
+			remainder = state
+			for chain, stride in zip(chains, strides):
+				progress = remainder % (len(chain) + 1)
+				remainder //= len(chain) + 1
+
+				if progress > 0:
+					currents.add(chain[progress - 1])
+				if progress < len(chain):
+					next_system = chain[progress]
+					candidates[next_system] = candidates.get(next_system, state) + stride
+
+			if state == 0:
+				currents.add(self.start)
+
+			row = state * number_of_systems
+			for current in currents:
+				length = cost[row + current]
+
+				if length == inf:
+					continue
+
+				distances_from_current = distances[current]
+				for next_system, next_state in candidates.items():
+					new_length = length + distances_from_current[next_system]
+					index = next_state * number_of_systems + next_system
+
+					if new_length < cost[index]:
+						cost[index] = new_length
+						parent[index] = row + current
+
+		# Everything is visited, but I still need to get home.
+		row = (number_of_states - 1) * number_of_systems
+		best_index = row
+		best_length = inf
+		for current in range(number_of_systems):
+			length = cost[row + current] + distances[current][0]
+
+			if length < best_length:
+				best_length = length
+				best_index = row + current
+
+		path = [self.start]
+		index = best_index
+		while index != self.start:
+			path.insert(1, index % number_of_systems)
+			index = parent[index]
+
+		self._new_record(path, best_length)
+		self.optimal = True
+
+		return False
+
+
 	# Dito just for the case that searching for the exact solution likely will
 	# need too much time.
-	# In here the program starts to go through all possible combinations of 
+	# In here the program goes through all possible combinations of 
 	# destinations to travel to for a given order of travelers. 
-	# _find_best_route() aborts if it exceeds the allotted time for a given 
-	# order of travelers. Afterwards _find_best_route() is called again with 
-	# a different order of travelers. 
+	# _find_best_route() aborts if it exceeds the allotted time (a "time 
+	# slice") for a given order of travelers. Afterwards _find_best_route() 
+	# is called again with a different order of travelers (a "restart"). 
 	# It is UNlikely that this function finds the exact solution. But it 
 	# probably finds a solution which is good enough considering that several 
-	# different orders of travelers are checked in the for-loop below.
-	# See the comment before the said for-loop for further details.
+	# different orders of travelers are checked in the loop below.
+	# See the comment before the said loop for further details.
 	# 
 	# ATTENTION: The bad situation described for _find_best_route() is likely 
 	# to occur here.
@@ -135,36 +1222,237 @@ class Routefinder(object):
 		siht = "Thus 'just' a good enough route will be calculated ... \n"
 		print(this + that + siht)
 
-		# To tell the user how far the algorithm has come I need to know how
-		# many permutations there are at all. 
-		number_of_permutations = factorial(len(self.travelers))
-
 		# < self.maximum_allowed_time > is the maximum time allowed for the 
-		# whole process. This needs to be shared over all possible permutations.
-		self.maximum_allowed_time = self.maximum_allowed_time / number_of_permutations
+		# whole process. It is set to the time slice of each restart below 
+		# (see _extend_route()) and restored in the end.
+		maximum_allowed_time = self.maximum_allowed_time
+		deadline = time() + maximum_allowed_time
+		shortest_time_slice = maximum_allowed_time * self.restart_time_fraction
 
 		# ATTENTION: In the worst case the very first point to be visited might 
 		# be a very bad choice which will lead to a very long processing time. 
 		# Hence, _find_best_route() aborts if it takes too much time.
 		# This is also one of the reasons why in here the order of travelers is 
-		# permuted. Just to get different starting points for the permutations. 
+		# changed. Just to get different starting points for the restarts. 
 		# This is effectively like randomizing the order of points to visit 
 		# under the given constraint, that I MUST visit the destinations of a 
 		# given traveler in the given order.
-		for i, order_of_travelers in enumerate(permutations(self.travelers)):
-			# The time from which "counting" starts needs to be new for each 
-			# permutation.
-			self.start_time = time()
+		# Originally the time was divided equally over ALL permutations of the 
+		# travelers. With 8 travelers each of them got just a few milliseconds 
+		# (too little to get anywhere), with 10 travelers microseconds. Now 
+		# random orders are tried and the time slices follow the Luby 
+		# sequence (1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...) times 
+		# < shortest_time_slice >: most restarts are short, but now and 
+		# then an order gets much more time to search deeper. This works well 
+		# without knowing in advance how much time a good order needs.
+		# Since each order of travelers covers ALL possible routes, a restart 
+		# that is NOT aborted has found the shortest route.
+		if self.workers > 1:
+			schedule = []
+			planned_time = 0.0
+			# Each process works on its own restarts. Hence, all of them 
+			# together can do < self.workers > times as many.
+			while planned_time < maximum_allowed_time * self.workers:
+				time_slice = shortest_time_slice * _luby(len(schedule) + 1)
+				schedule.append((self._random_order(), time_slice))
+				planned_time += time_slice
 
-			path = [self.origin, self.origin]
+			aborted = self._find_parallel_solution(schedule, 1, None, deadline, \
+															one_is_enough = True)
+		else:
+			restart = 0
+			aborted = True
 
-			aborted = self._find_best_route(path, order_of_travelers)
+			while aborted and time() < deadline and not self._stop_requested():
+				restart += 1
+				time_slice = shortest_time_slice * _luby(restart)
 
-			if aborted:
-				this = "This needs too much time. Trying a radically new order of "
-				that = "locations to travel to "
-				siht = "({} of {}) ... ".format(i + 1, number_of_permutations)
-				print(this + that + siht)
+				this = "Trying a radically new order of locations to travel to "
+				that = "(restart {}, {:.2f} s) ... ".format(restart, time_slice)
+				print(this + that)
+
+				# The time from which "counting" starts needs to be new for 
+				# each restart.
+				self.start_time = time()
+				self.maximum_allowed_time = min(time_slice, deadline - self.start_time)
+
+				aborted = self._find_best_route(self._random_order())
+
+		self.maximum_allowed_time = maximum_allowed_time
+
+		if aborted:
+			self.abort_reason = 'time_slices'
+		else:
+			self.optimal = True
+
+
+	# This method returns a random order of < self.chains >.
+	def _random_order(self):
+		order = list(self.chains)
+		self.random.shuffle(order)
+
+		return order
+
+
+	# This method splits the recursive search over < self.workers > processes.
+	# < schedule > is a list of (order of travelers, allowed time). For each 
+	# of them the search tree is cut into (at least) < number_of_pieces > 
+	# pieces by going through the first few destinations here (see 
+	# _split_search()). Each piece is one task for the worker processes 
+	# which gets the allowed time. 
+	# The processes share the shortest distance found so far (in 
+	# < self.shared_record_length >) and hence each of them abandons paths 
+	# that are longer than the best route found by ANY process.
+	# If < start_time > is None, the time is counted from the start of each 
+	# task on (like in _find_good_enough_solution()). Otherwise from 
+	# < start_time > for all of them. The whole search stops at < deadline > 
+	# (a value of time()) in any case.
+	# If < one_is_enough > is True, the search stops as soon as ONE task 
+	# went through all of its routes. This makes sense if each task covers 
+	# ALL possible routes (< number_of_pieces > is 1).
+	# 
+	# Returns True if any of the tasks was aborted (or, with 
+	# < one_is_enough >, if none of them finished).
+	def _find_parallel_solution(self, schedule, number_of_pieces, start_time, deadline, \
+															one_is_enough = False):
+		print("Searching with {} processes ...\n".format(self.workers))
+
+		self.shared_record_length = multiprocessing.Value('d', self.record_length)
+
+		tasks = []
+		for chains, allowed_time in schedule:
+			for prefix in self._split_search(chains, number_of_pieces):
+				tasks.append((chains, prefix, start_time, allowed_time))
+
+		aborted = False
+		finished = False
+		self.shared_stop = multiprocessing.Value('b', 0, lock = False)
+		pool = multiprocessing.Pool(self.workers, initializer = _initialize_worker, \
+								initargs = (self, self.shared_record_length, self.shared_stop))
+		results = pool.imap_unordered(_search_in_worker, tasks)
+		# When the processes were told to stop. None as long as they weren't.
+		# Afterwards, the results are still merged until all tasks returned 
+		# (the running ones stop at once and the others right at the 
+		# beginning). Terminating the processes instead could hang forever 
+		# (see _close_pool()) and the best route of a task would be lost.
+		stop_time = None
+
+		try:
+			while True:
+				# Waiting just a little while for the next result makes it 
+				# possible to stop at < deadline > (or when the search is 
+				# cancelled) even if all processes are busy with long tasks.
+				try:
+					result = results.next(timeout = 0.1)
+				except multiprocessing.TimeoutError:
+					result = None
+				except StopIteration:
+					break
+
+				if result is not None:
+					task_aborted, length, path, nodes, pruned = result
+					aborted = aborted or task_aborted
+					finished = finished or not task_aborted
+					self.nodes += nodes
+					self.pruned += pruned
+
+					# The merge happens just via the paths. The processes print 
+					# their improvements themselves.
+					if path is not None and length < self.record_length:
+						self.record_length = length
+						self.record_path = path
+						self.stats.improvements.append((time() - self.creation_time, length))
+						self._check_gap()
+
+						if self.callback is not None:
+							self.callback(self.record_path, self.record_length)
+
+					# The processes search different parts at the same time. 
+					# Hence, there is no single frontier.
+					if self.checkpoint is not None:
+						self.checkpoint.maybe_save(self)
+
+					# A finished task proves that no route is shorter than the 
+					# best one of ALL processes. But this route may belong to 
+					# a task that is still running and isn't known here yet.
+					if one_is_enough and finished and \
+							self.record_length <= self.shared_record_length.value:
+						break
+
+				if stop_time is None and (time() > deadline or self._stop_requested()):
+					aborted = True
+					self.shared_stop.value = 1
+					stop_time = time()
+
+				if stop_time is not None and time() - stop_time > self.shutdown_grace_time:
+					break
+		finally:
+			if stop_time is None:
+				stop_time = time()
+
+			self._close_pool(pool, results, stop_time + self.shutdown_grace_time)
+
+		if one_is_enough:
+			aborted = not finished or self.record_length > self.shared_record_length.value
+
+		self.shared_record_length = None
+		self.shared_stop = None
+
+		return aborted
+
+
+	# This method returns a list of prefixes (lists of ids without origin) of 
+	# routes. Together they cover ALL possible routes (for the given order of 
+	# < chains >), and there are at least < number_of_pieces > of them 
+	# (if there are enough routes at all). A prefix may be a complete route.
+	def _split_search(self, chains, number_of_pieces):
+		prefixes = [[]]
+
+		while len(prefixes) < number_of_pieces:
+			longer_prefixes = []
+
+			for prefix in prefixes:
+				progress = self._replay(chains, prefix)
+				points = self._next_points(chains, progress)
+
+				if not points:
+					longer_prefixes.append(prefix)
+
+				for point in points:
+					longer_prefixes.append(prefix + [point])
+
+			# Nothing left to split.
+			if len(longer_prefixes) == len(prefixes):
+				break
+
+			prefixes = longer_prefixes
+
+		return prefixes
+
+
+	# This method returns a list with the progress of each traveler after 
+	# visiting the destinations in < prefix >.
+	def _replay(self, chains, prefix):
+		progress = [0] * len(chains)
+
+		for point in prefix:
+			for i, chain in enumerate(chains):
+				if progress[i] < len(chain) and chain[progress[i]] == point:
+					progress[i] += 1
+
+		return progress
+
+
+	# This method returns the list of the (different) next destinations for
+	# the given < progress >.
+	def _next_points(self, chains, progress):
+		points = []
+
+		for chain, visited in zip(chains, progress):
+			if visited < len(chain) and chain[visited] not in points:
+				points.append(chain[visited])
+
+		return points
 
 
 	# This function sums up the distances between all points in a given < path >.
@@ -172,10 +1460,10 @@ class Routefinder(object):
 		length = 0
 
 		for i in range(len(path) - 1):
-			first = path[i]
-			second = path[i + 1]
+			first = self.ids[path[i]]
+			second = self.ids[path[i + 1]]
 
-			length += self.distances[first][second]
+			length += self.distance_table[first][second]
 
 		return length
 
@@ -183,6 +1471,9 @@ class Routefinder(object):
 	# With this recursive function the program goes through all possible 
 	# combinations of points to be visited and calculates for each the exact 
 	# path-length. The best solution is saved as attribute of this class.
+	# < chains > are the lists of ids of the destinations of all travelers
+	# (see _assign_ids()). The order of the travelers in it determines in 
+	# which order the possible next points are tried.
 	# 
 	# ATTENTION: The shortest path may require to visit one point twice (or 
 	# even more often). An example that illustrates this may be the following.
@@ -190,7 +1481,7 @@ class Routefinder(object):
 	# for one traveler but last for another. In that case it doesn't make sense 
 	# to wait to visit the first point for the first visitor until the 2nd 
 	# is "processed".
-	# ATTENTION: For more than 14 points (including twice the start / end) 
+	# ATTENTION: For more than 16 points (including twice the start / end) 
 	# this takes too much time. Thus _find_good_enough_solution() exists which 
 	# returns a route which shouldn't be too bad either.
 	# See comments to said method for more details.
@@ -201,61 +1492,145 @@ class Routefinder(object):
 	# often (if at all). If it isn't _do_all() contains the second condition
 	# which will call _find_good_enough_solution() and then this will become
 	# relevant.
-	def _find_best_route(self, this_path, travelers):
-		# I need to take the very first elements in the points of interests of 
-		# the travelers because they don't want to see a destination if they 
-		# haven't seen the previous one.
-		points = []
-		for traveler in travelers:
-			# Some travelers might want to visit fewer locations than others.
-			# Since I'm deleting the already visited locations, this may lead to 
-			# errors.
-			try:
-				points.append(traveler[0])
-			except IndexError:
-				pass
+	# 
+	# If a < prefix > (a list of ids without origin) is given, just routes 
+	# that start with it are searched through.
+	def _find_best_route(self, chains, prefix = ()):
+		# How far along its list each traveler is.
+		progress = self._replay(chains, prefix)
+		# The route so far. The way back to origin is NOT part of it.
+		path = [self.start] + list(prefix)
+		length = self._length_of_path([self.names[x] for x in path])
+		remaining = sum([len(chain) - visited for chain, visited in zip(chains, progress)])
+
+		if remaining == 0:
+			self._new_record(path, length + self.distance_table[path[-1]][0])
+			return False
+
+		# See _tails().
+		tails = self._tails(chains)
+
+		# < pending[i] > is how often the system with id i still needs to be 
+		# visited (summed over all travelers) and ...
+		pending = [0] * len(self.names)
+		for chain, visited in zip(chains, progress):
+			for point in chain[visited:]:
+				pending[point] += 1
+
+		# ... each of these systems needs to be flown to at least once. 
+		# < ways_in > is the sum of the shortest ways into these systems.
+		ways_in = sum([self.shortest_way_in[x] for x in range(len(pending)) if pending[x] > 0])
+
+		bounds = (tails, pending, ways_in)
+
+		# Most orders of destinations end up in the same situation: the same 
+		# progress of all travelers and the same current system (see 
+		# _find_dynamic_programming_solution()). Everything that can be 
+		# reached from there was already searched through the first time 
+		# this situation was reached. Hence, if it is reached again with a 
+		# path that isn't shorter, there is no need to search again.
+		# Each situation is encoded as ONE integer: the progress of all 
+		# travelers as mixed-radix number (< strides > are the "values" of 
+		# the digits) times the number of systems plus the current system. 
+		# < self.transpositions > contains these integers as keys and the 
+		# length of the shortest path that reached them as values. Just the 
+		# < self.maximum_transpositions > most recently used ones are kept to 
+		# limit the memory.
+		# The situations of a previous call may not have been searched 
+		# through completely (if it was aborted).
+		self.transpositions = OrderedDict()
+		strides = []
+		state = 0
+		number_of_states = 1
+		for chain, visited in zip(chains, progress):
+			strides.append(number_of_states)
+			state += visited * number_of_states
+			number_of_states *= len(chain) + 1
+
+		# The possible next points for each situation (see _candidates()). 
+		# They depend on the order of < chains >.
+		self.all_candidates = {state: self._candidates(chains, progress, strides, tails)}
+
+		return self._extend_route(chains, progress, path, length, remaining, bounds, \
+										strides, state, self.all_candidates[state])
+
+
+	# This method returns a list < tails > with < tails[i][j] > being the 
+	# length of the remaining list of traveler i from its j-th destination to 
+	# its last one and from there back to origin. Whatever route is flown, it 
+	# can never be shorter than this.
+	def _tails(self, chains):
+		tails = []
+		for chain in chains:
+			tail = [0.0] * (len(chain) + 1)
+			if chain:
+				tail[-2] = self.distance_table[chain[-1]][0]
+			for j in range(len(chain) - 2, -1, -1):
+				tail[j] = tail[j + 1] + self.distance_table[chain[j]][chain[j + 1]]
+			tails.append(tail)
+
+		return tails
+
+
+	# This method does the actual recursive search for _find_best_route().
+	# Originally each recursive call got fresh copies of the path and the 
+	# lists of the travelers and the length of the whole path was re-summed 
+	# each time. That needed most of the process time. Now < progress > 
+	# and < path > are changed in place and the changes are undone before the 
+	# next point is tried. The length of < path > is carried along as 
+	# < length > and < remaining > is the number of destinations that still 
+	# need to be visited (summed over all travelers).
+	# 
+	# < bounds > contains what is needed to calculate a lower bound for the 
+	# distance that still needs to be flown (see _find_best_route()). The 
+	# bound is the larger one of:
+	# - the longest remaining list of any traveler (flown in its order and 
+	#   incl. the way to its next destination and back to origin),
+	# - the sum of the shortest ways into all systems that still need to be 
+	#   visited (and into origin).
+	# Both can never be larger than the true remaining distance. Hence, a path 
+	# can be abandoned as soon as its length plus this bound is not shorter 
+	# than the best route so far.
+	# 
+	# < strides > and < state > encode the situation at the end of < path > 
+	# (see _find_best_route()) and < candidates > are the possible next 
+	# points in it (see _candidates()).
+	def _extend_route(self, chains, progress, path, length, remaining, bounds, \
+													strides, state, candidates):
+		distance_table = self.distance_table
+		transpositions = self.transpositions
+		all_candidates = self.all_candidates
+		number_of_systems = len(distance_table)
+		distances_from_current = distance_table[path[-1]]
+		tails, pending, ways_in = bounds
+		shortest_way_in = self.shortest_way_in
+
+		first = 0
+		if self.resume_path is not None:
+			first = self._resume_point(chains, progress, path)
+
+		for i, point, advancing, step, tail in candidates:
+			if i < first:
+				continue
 
-		for point in points:
 			# The check how much time the search process needed so far.
-			if (time() - self.start_time) > self.maximum_allowed_time:
-				return True
+			self.nodes += 1
+			if self.nodes % self.time_check_interval == 0:
+				if self._time_is_up():
+					if self.checkpoint is not None:
+						self._save_checkpoint(chains, path, now = True)
+					return True
 
-			# For each iteration I need a fresh start from the original 
-			# configuration of points of interest.
-			# To < local_path > I will add and ...
-			local_path = deepcopy(this_path)
-			# ... from < local_travelers > I will subtract an element. These 
-			# two modified lists go then as new original configuration into the 
-			# next recursive call of _find_best_route().
-			local_travelers = deepcopy(travelers)
-			# .insert(-1, point) inserts at the second to last position in the 
-			# list. This is correct, since the last element is fixed and in 
-			# each recursive call of _find_best_route() the order of the 
-			# previous elements shall not change.
-			local_path.insert(-1, point)
-
-			# Now remove < point > from the list of the travelers if it is
-			# the next destination to be visited for them, because with adding 
-			# to < local_path > it is visited.
-			# I do NOT break the loop once I found < point > in one of the 
-			# travelers lists because several travelers could want to visit the
-			# same point.
-			for traveler in local_travelers:
-				try:
-					# ATTENTION: JUST the next point of interest can be 
-					# considered when looking up if < point > is a point of
-					# interest for < traveler >. This is because I'm not 
-					# allowed to visit points further down < travelers > list
-					# if I haven't been to the previous ones.
-					if point in traveler[0]:
-						traveler.pop(0)
-				except IndexError:
-					pass
+				# Another process may have found a better route.
+				if self.shared_record_length is not None:
+					self.record_length = min(self.record_length, \
+											self.shared_record_length.value)
+					self._check_gap()
 
-			# This is to check below if there is more to visit.
-			more_to_visit = sum([len(traveler) for traveler in local_travelers])
+				if self.checkpoint is not None:
+					self._save_checkpoint(chains, path)
 
-			length_local_path = self._length_of_path(local_path)
+			new_length = length + distances_from_current[point]
 
 			# Some paths may be so bad that even before recursively going 
 			# through all remaning possibilities it is longer than the 
@@ -263,42 +1638,378 @@ class Routefinder(object):
 			# because it is meaningless. Rather continue with the next 
 			# point in the list. This speeds the whole process considerably 
 			# up! With this it needs up to 5 times less time!
-			if length_local_path > self.record_length:
+			# The way back home needs to be flown in any case.
+			if new_length + distance_table[point][0] > self.record_length:
+				self.pruned += 1
 				continue
 
+			# Now advance all travelers for which < point > is the next 
+			# destination, because with adding it to < path > it is visited.
+			# Several travelers could want to visit the same point.
+			for k in advancing:
+				progress[k] += 1
+			advanced = len(advancing)
+			new_state = state + step
+
+			pending[point] -= advanced
+			new_ways_in = ways_in
+			if pending[point] == 0:
+				new_ways_in -= shortest_way_in[point]
+
+			aborted = False
 			# Once there is nothing else to visit, ...
-			if more_to_visit == 0:
+			if remaining == advanced:
+				path.append(point)
 				# ... check how long the path is and set it as new best path 
 				# if it is shorter.
-				if length_local_path < self.record_length:
-					self.record_length = length_local_path
-					self.record_path = local_path
-
-					this = "The shortest route found so far has a distance "
-					# Stating the precision automatically rounds float values.
-					that = "of: {0:.2f} ly. ".format(self.record_length)
-					siht = "Continue searching for a better route ..."
-					print(this + that + siht)
-
+				self._new_record(path, new_length + distance_table[point][0])
+				path.pop()
 			# But if there are still points to be visited, ...
 			else:
-				# ... call yourself.
-				self._find_best_route(local_path, local_travelers)
+				next_candidates = all_candidates.get(new_state)
+				if next_candidates is None:
+					next_candidates = self._candidates(chains, progress, strides, tails)
+					if len(all_candidates) >= self.maximum_transpositions:
+						all_candidates.clear()
+					all_candidates[new_state] = next_candidates
+
+				distances_from_point = distance_table[point]
+				bound = distances_from_point[0]
+				for _, next_point, _, _, next_tail in next_candidates:
+					this_bound = distances_from_point[next_point] + next_tail
+					if this_bound > bound:
+						bound = this_bound
+
+				# If < point > itself still needs to be visited again, this 
+				# might not need any flying at all. But origin needs to be 
+				# flown to in the end.
+				other_bound = new_ways_in
+				if pending[point] > 0:
+					other_bound -= shortest_way_in[point]
+				if pending[0] == 0:
+					other_bound += shortest_way_in[0]
+				if other_bound > bound:
+					bound = other_bound
+
+				key = new_state * number_of_systems + point
+				known_length = transpositions.get(key)
+
+				if new_length + bound >= self.record_length:
+					self.pruned += 1
+				elif known_length is not None and known_length <= new_length:
+					transpositions.move_to_end(key)
+					self.pruned += 1
+				else:
+					transpositions[key] = new_length
+					transpositions.move_to_end(key)
+					if len(transpositions) > self.maximum_transpositions:
+						transpositions.popitem(last = False)
+
+					path.append(point)
+					# ... call yourself.
+					aborted = self._extend_route(chains, progress, path, \
+							new_length, remaining - advanced, \
+							(tails, pending, new_ways_in), strides, new_state, \
+							next_candidates)
+					path.pop()
+
+			# Undo the changes for the next point to try.
+			pending[point] += advanced
+			for k in advancing:
+				progress[k] -= 1
+
+			if aborted:
+				return True
+
+		return False
+
+
+	# This method returns the possible next points for the situation given 
+	# by < progress > (see _extend_route()). Each of them is a tuple with:
+	# - the index of the first traveler that wants to go there next (the 
+	#   points are in the order of these indices),
+	# - the id of the point,
+	# - the indices of ALL travelers that want to go there next (since all 
+	#   of them make progress if it is visited),
+	# - how much the integer that encodes the situation increases if it is 
+	#   visited (see _find_best_route()) and
+	# - the longest remaining list of these travelers (see < tails > in 
+	#   _find_best_route()).
+	# Originally all this was figured out anew for every single node. Now 
+	# it is done just once for each situation.
+	def _candidates(self, chains, progress, strides, tails):
+		candidates = []
+		# < index[point] > is the index of < point > in < candidates >.
+		index = {}
+
+		for i, chain in enumerate(chains):
+			visited = progress[i]
+			# Some travelers might want to visit fewer locations than others.
+			if visited == len(chain):
+				continue
+
+			# I need to take the very next element of the travelers because 
+			# they don't want to see a destination if they haven't seen the 
+			# previous one.
+			point = chain[visited]
+
+			if point not in index:
+				index[point] = len(candidates)
+				candidates.append([i, point, [], 0, 0.0])
+
+			candidate = candidates[index[point]]
+			candidate[2].append(i)
+			candidate[3] += strides[i]
+			candidate[4] = max(candidate[4], tails[i][visited])
+
+		return [(i, point, tuple(advancing), step, tail) \
+							for i, point, advancing, step, tail in candidates]
+
+
+	# This method uses the route for the same missions in the result cache 
+	# (if there is one) as first best route. If it is known to be the 
+	# shortest route, there is nothing left to do.
+	def _use_cached_result(self):
+		cache = crc.ResultCache(self.result_cache_file)
+		result = cache.get(self._missions_key())
+		cache.close()
+
+		if result is None:
+			return
+
+		self._use_incumbent(result['route'])
+
+		if result['optimal'] and self.record_length <= result['length']:
+			print("The shortest route for these missions is already known.\n")
+			self.optimal = True
+		else:
+			print("Starting with the best route found for these missions before ...\n")
+
+
+	# This method stores the best route in the result cache.
+	def _store_result(self):
+		if self.record_path is None:
+			return
+
+		cache = crc.ResultCache(self.result_cache_file)
+		cache.put(self._missions_key(), self.record_path, self.record_length, \
+						self.optimal, self.solver, self.maximum_allowed_time)
+		cache.close()
+
+
+	# This method returns the key of the missions in the result cache.
+	def _missions_key(self):
+		return crc.missions_key(self.origin, self.names[self.start], self.travelers)
+
+
+	# This method continues where the run stopped that wrote the state in 
+	# < self.checkpoint > (if there is such a state): its best route becomes 
+	# the first best route, the random number generator gets the same seed 
+	# and the recursive search starts at its frontier.
+	def _resume(self):
+		state = self.checkpoint.state_for(self)
+		if state is None:
+			return
+
+		print("Continuing the search of the checkpoint in {} ...\n".format(self.checkpoint.path))
+
+		self.seed = state['seed']
+		self.random.seed(self.seed)
+
+		if state['record_path'] is not None:
+			self._use_incumbent(state['record_path'])
+
+		if state['frontier'] is not None:
+			self.resume_frontier = [self.ids[x] for x in state['frontier']]
+
+		self.optimal = state['optimal']
+
+
+	# This method returns the index of the traveler _extend_route() shall 
+	# start with for < path > (and the corresponding < progress >) while 
+	# resuming. Before the frontier at < self.resume_path > everything was 
+	# already searched through. Since _extend_route() tries the next points 
+	# in the order of the travelers (and each point just for the first 
+	# traveler that wants to go there), the next point of the frontier 
+	# determines this index.
+	def _resume_point(self, chains, progress, path):
+		resume_path = self.resume_path
+		depth = len(path)
+
+		# Either the search left the frontier behind or it reached its end. 
+		# In both cases everything from here on needs to be searched through.
+		if depth >= len(resume_path) or path != resume_path[:depth]:
+			self.resume_path = None
+			return 0
+
+		point = resume_path[depth]
+		for i in range(len(chains)):
+			if progress[i] < len(chains[i]) and chains[i][progress[i]] == point:
+				return i
+
+		self.resume_path = None
+		return 0
+
+
+	# This method hands the state of the search to < self.checkpoint >. 
+	# < path > is the path _extend_route() is working on. It is just a 
+	# frontier for the search of _find_exact_solution() (the one with 
+	# < self.chains >). The restarts of _find_good_enough_solution() use 
+	# other orders of travelers each time.
+	# If < now > is True, the state is written in any case.
+	def _save_checkpoint(self, chains, path, now = False):
+		frontier = list(path) if chains is self.chains else None
+
+		if now and frontier is not None:
+			self.checkpoint.save(self, frontier)
+		else:
+			self.checkpoint.maybe_save(self, frontier)
+
+
+	# This method stores < path > (a list of ids WITHOUT the way back to 
+	# origin) as the new best route if < length > is shorter than the best 
+	# length so far.
+	def _new_record(self, path, length):
+		if length < self.record_length:
+			if self.first_record_time is None:
+				self.first_record_time = time() - self.creation_time
+
+			if self.shared_record_length is not None:
+				with self.shared_record_length.get_lock():
+					if length >= self.shared_record_length.value:
+						self.record_length = self.shared_record_length.value
+						return
+
+					self.shared_record_length.value = length
+
+					if self.shared_record_path is not None:
+						self._write_shared_path(path)
+
+			self.record_length = length
+			self.record_path = [self.names[x] for x in path] + [self.origin]
+			self.stats.improvements.append((time() - self.creation_time, length))
+			self._check_gap()
+
+			this = "The shortest route found so far has a distance "
+			# Stating the precision automatically rounds float values.
+			that = "of: {0:.2f} ly. ".format(self.record_length)
+			if self.lower_bound > 0.0:
+				that += "It is at most {0:.1f} % longer than the shortest route. ".format(100 * self.gap())
+			siht = "Continue searching for a better route ..."
+			print(this + that + siht)
+
+			if self.callback is not None:
+				self.callback(self.record_path, self.record_length)
+
+
+# This function returns the < i >-th number (starting at 1) of the Luby 
+# sequence: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, 1, ...
+def _luby(i):
+	k = 1
+	while (1 << k) - 1 < i:
+		k += 1
+
+	if i == (1 << k) - 1:
+		return 1 << (k - 1)
+
+	return _luby(i - (1 << (k - 1)) + 1)
+
+
+# The Routefinder instance in a worker process of _find_parallel_solution().
+_worker_routefinder = None
+
+
+# This function is called once in each worker process of 
+# _find_parallel_solution() (and _race_solvers()). < routefinder > is a 
+# copy of the Routefinder instance that started the processes.
+def _initialize_worker(routefinder, shared_record_length, shared_stop, \
+													shared_record_path = None):
+	global _worker_routefinder
+
+	_worker_routefinder = routefinder
+	_worker_routefinder.shared_record_length = shared_record_length
+	_worker_routefinder.shared_stop = shared_stop
+	_worker_routefinder.shared_record_path = shared_record_path
+	# Just the process that started the workers writes checkpoints and 
+	# reports better routes.
+	_worker_routefinder.checkpoint = None
+	_worker_routefinder.callback = None
+
+
+# This function does one task of _find_parallel_solution() in a worker 
+# process. It returns if the search was aborted, the best route found 
+# (and its length) or None if no route better than the best route of all 
+# processes was found and the number of searched and pruned nodes.
+def _search_in_worker(task):
+	chains, prefix, start_time, allowed_time = task
+	routefinder = _worker_routefinder
 
+	routefinder.start_time = time() if start_time is None else start_time
+	routefinder.maximum_allowed_time = allowed_time
+	routefinder.record_length = routefinder.shared_record_length.value
+	routefinder.record_path = None
+	routefinder.nodes = 0
+	routefinder.pruned = 0
 
+	# The tasks that start after the processes were told to stop (or after 
+	# the time is used up) don't search at all.
+	if routefinder._time_is_up():
+		return True, None, None, 0, 0
 
+	aborted = routefinder._find_best_route(chains, prefix)
 
+	if routefinder.record_path is None:
+		return aborted, None, None, routefinder.nodes, routefinder.pruned
 
+	length = routefinder._length_of_path(routefinder.record_path)
 
+	return aborted, length, routefinder.record_path, routefinder.nodes, \
+															routefinder.pruned
 
 
+# This function runs one method of _race_solvers() in a worker process 
+# until < deadline > (a value of time()). It returns the name of the 
+# method, if it proved that the best route of all processes is the 
+# shortest one and the number of searched and pruned nodes. The best route 
+# itself is in < shared_record_path >.
+def _race_in_worker(task):
+	strategy, deadline = task
+	routefinder = _worker_routefinder
 
+	routefinder.start_time = time()
+	routefinder.maximum_allowed_time = max(0.0, deadline - routefinder.start_time)
+	# Each method runs in just this process.
+	routefinder.workers = 1
 
+	if strategy == 'dynamic':
+		routefinder.optimal = not routefinder._find_dynamic_programming_solution()
+	elif strategy == 'recursive':
+		routefinder._find_exact_solution()
+	elif strategy == 'restarts':
+		routefinder._find_good_enough_solution()
+	elif strategy == 'beam':
+		routefinder._find_beam_solution()
+	elif strategy == 'genetic':
+		routefinder._find_genetic_solution()
+	else:
+		routefinder._find_annealing_solution()
 
+	return strategy, routefinder.optimal, routefinder.nodes, routefinder.pruned
 
 
+# This function evolves one population of _find_genetic_solution() in a 
+# worker process until < deadline > (a value of time()). It returns the 
+# number of routes that were evaluated. The best route is in 
+# < shared_record_path >.
+def _evolve_in_worker(task):
+	seed, deadline = task
+	routefinder = _worker_routefinder
 
+	routefinder.nodes = 0
+	genetic = cg.Genetic(routefinder, routefinder.population_size, seed)
+	genetic.run(time(), max(0.0, deadline - time()))
 
+	return routefinder.nodes
 
 
 
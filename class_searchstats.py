@@ -0,0 +1,105 @@
+#    "class_searchstats" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definition for the object that collects some
+# numbers about a run: how long each part took, how many nodes the search
+# went through, when better routes were found and why the search ended.
+# These numbers help to understand why a run was slow.
+
+
+import json
+
+
+# This class just stores the numbers. It is instantiated in class
+# Routefinder, which fills it.
+class SearchStats(object):
+	def __init__(self):
+		# The solver that was used (see class Routefinder).
+		self.solver = None
+		# A dict with the names of the parts of a run as keys and how long
+		# they took (in seconds) as values.
+		self.phase_times = {}
+		# The number of nodes the search went through (or the steps of the
+		# solvers that don't have nodes).
+		self.nodes = 0
+		# The number of nodes that were NOT searched further because they
+		# couldn't lead to a shorter route than the best one so far.
+		self.pruned = 0
+		# A list of (seconds since the search started, length) for each
+		# better route that was found.
+		self.improvements = []
+		# True if it is proven that the best route found is the shortest
+		# possible route.
+		self.optimal = False
+		# Why the search ended before it went through all possibilities. None
+		# if it didn't.
+		self.abort_reason = None
+		# No route can be shorter than this (see class_lowerbound.py).
+		self.lower_bound = 0.0
+		# The fraction by which the best route is at most longer than the
+		# shortest route. None if there is no route.
+		self.gap = None
+
+
+	# This method adds < seconds > to the time of the part < phase >.
+	def add_phase(self, phase, seconds):
+		self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+
+	# This method returns all the numbers as dict.
+	def to_dict(self):
+		stats = {}
+		stats['solver'] = self.solver
+		stats['phase_times'] = dict(self.phase_times)
+		stats['nodes'] = self.nodes
+		stats['pruned'] = self.pruned
+		stats['improvements'] = [{'time': x, 'length': y} for x, y in self.improvements]
+		stats['optimal'] = self.optimal
+		stats['abort_reason'] = self.abort_reason
+		stats['lower_bound'] = self.lower_bound
+		stats['gap'] = self.gap
+
+		return stats
+
+
+	# This method writes all the numbers as JSON into the file < path >.
+	def write_json(self, path):
+		with open(path, 'w') as f:
+			json.dump(self.to_dict(), f, indent = 1)
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
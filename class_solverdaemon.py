@@ -0,0 +1,297 @@
+#    "class_solverdaemon" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the class definitions for the objects that are needed
+# to keep this program running in the background and to answer requests for
+# routes via HTTP (see solver_daemon.py).
+#
+# Starting the program, reading the cache and asking EDSM takes usually
+# much longer than finding the route itself. The daemon does all this just
+# once: the coordinates of all systems it ever saw and the results of all
+# mission sets it ever solved are kept in memory.
+#
+# A request is a POST to /solve with a mission set as JSON (see
+# class_batch.py). It may also contain 'maximum_time' (in seconds, but not
+# more than the daemon allows) and 'solver'. The answer is the result as
+# JSON (see find_route() in class_batch.py).
+
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import OrderedDict
+from multiprocessing import Pool
+import threading
+import math
+import json
+
+import class_datagrabber as cd
+import class_batch as cb
+import additional_functions as ad
+
+
+# This class does the same as class DataGrabber for one mission set, except
+# that the coordinates are first looked up in the memory of the daemon.
+# Just the systems the daemon hasn't seen yet are looked up in the cache,
+# EDSM or the galaxy index (and remembered afterwards).
+class RequestGrabber(cd.DataGrabber):
+	# < mission_set > is, well, the mission set and < daemon > the SolverDaemon
+	# instance.
+	def __init__(self, mission_set, daemon):
+		self.mission_set = mission_set
+		self.daemon = daemon
+
+		cd.DataGrabber.__init__(self, None, daemon.cache_file, daemon.edsm_url, \
+															daemon.galaxy_index)
+
+
+	# The daemon (with all the coordinates it knows) isn't needed to find the
+	# route and would be sent along to the worker processes otherwise.
+	def __getstate__(self):
+		state = cd.DataGrabber.__getstate__(self)
+		del state['daemon']
+
+		return state
+
+
+	# The missions are already in < self.mission_set >.
+	def _get_missions(self):
+		self.origin = self.mission_set['origin']
+		self.travelers = [list(x) for x in self.mission_set['travelers']]
+
+
+	def _get_remote_coordinates(self, names):
+		return self._get_known_coordinates(names, cd.DataGrabber._get_remote_coordinates)
+
+
+	def _get_indexed_coordinates(self, names):
+		return self._get_known_coordinates(names, cd.DataGrabber._get_indexed_coordinates)
+
+
+	# This method returns a dict with the coordinates of all systems in
+	# < names > (like _get_remote_coordinates()). The systems the daemon
+	# doesn't know yet are looked up with < lookup >.
+	def _get_known_coordinates(self, names, lookup):
+		known = self.daemon.coordinates
+
+		missing = [name for name in names if name not in known]
+		if missing:
+			known.update(lookup(self, missing))
+
+		return {name: known[name] for name in names}
+
+
+# This class handles ONE request. The HTTP server creates a new instance for
+# each request (each in its own thread).
+class RequestHandler(BaseHTTPRequestHandler):
+	def do_GET(self):
+		if self.path != '/status':
+			self._answer(404, {'error': 'Unknown path {}.'.format(self.path)})
+			return
+
+		self._answer(200, self.server.solver_daemon.status())
+
+
+	def do_POST(self):
+		if self.path != '/solve':
+			self._answer(404, {'error': 'Unknown path {}.'.format(self.path)})
+			return
+
+		try:
+			length = int(self.headers.get('Content-Length', 0))
+			mission_set = json.loads(self.rfile.read(length).decode())
+			self.server.solver_daemon.check_request(mission_set)
+		except ValueError as error:
+			this = "The request needs to be a JSON object with 'origin' and "
+			that = "'travelers' ({}).".format(error)
+			self._answer(400, {'error': this + that})
+			return
+
+		result = self.server.solver_daemon.solve(mission_set)
+		self._answer(result.get('status', 400 if 'error' in result else 200), result)
+
+
+	# This method sends < content > as JSON with the status code < code >.
+	def _answer(self, code, content):
+		body = json.dumps(content).encode()
+
+		self.send_response(code)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+
+# This class is the daemon itself. It is instantiated in solver_daemon.py.
+class SolverDaemon(object):
+	# < maximum_allowed_time > is the maximum time that can be used for ONE
+	# request. Requests that don't say how much time they want get this much.
+	# < workers > is the number of processes that find routes. This many
+	# requests are answered at the same time.
+	# < solver > is the solver (see class Routefinder) for requests that don't
+	# say which one they want.
+	# See class DataGrabber for the other parameters.
+	def __init__(self, maximum_allowed_time, workers = 1, solver = 'auto', \
+							cache_file = None, edsm_url = 'https://www.edsm.net/api-v1/', \
+							galaxy_index = None):
+		self.maximum_allowed_time = maximum_allowed_time
+		self.workers = workers
+		self.solver = solver
+		self.cache_file = cache_file
+		self.edsm_url = edsm_url
+		self.galaxy_index = galaxy_index
+		# A dict with the names of all systems the daemon has seen so far as
+		# keys and their coordinates (dicts with the keys 'x', 'y' and 'z') as
+		# values.
+		self.coordinates = {}
+		# A dict with the mission sets (and time and solver) that were solved
+		# before (as JSON, see _key()) as keys and their results as values.
+		# Just the < self.maximum_results > that were used last are kept. 
+		# Otherwise a daemon that runs for a long time would need more and 
+		# more memory.
+		self.results = OrderedDict()
+		self.maximum_results = 10000
+		self.requests = 0
+		# The processes that find the routes. Created BEFORE any threads
+		# exist, since starting processes from a program with threads is
+		# asking for trouble.
+		self.pool = Pool(workers)
+		self.lock = threading.Lock()
+
+
+	# This method raises ValueError if < mission_set > is not a valid 
+	# request: a mission set (see check_mission_set() in class_batch.py) 
+	# that may say how much time and which solver it wants. Instance files 
+	# can't be used via HTTP, since this would make it possible to read any 
+	# file.
+	def check_request(self, mission_set):
+		cb.check_mission_set(mission_set)
+
+		if 'instance' in mission_set:
+			raise ValueError("Instance files can't be used in a request.")
+
+		if 'maximum_time' in mission_set:
+			maximum_time = mission_set['maximum_time']
+			try:
+				# json reads true and false as bool, which float() accepts.
+				if isinstance(maximum_time, bool):
+					raise TypeError
+				maximum_time = float(maximum_time)
+			except (ValueError, TypeError):
+				raise ValueError("'maximum_time' needs to be a number.")
+			# json also reads NaN and Infinity. With them the search would
+			# never stop.
+			if not math.isfinite(maximum_time) or maximum_time <= 0:
+				raise ValueError("'maximum_time' needs to be finite and positive.")
+
+		if mission_set.get('solver', self.solver) not in ad.SOLVERS:
+			this = "'solver' needs to be one of: {}.".format(', '.join(ad.SOLVERS))
+			raise ValueError(this)
+
+
+	# This method returns the result for < mission_set > (a dict like the
+	# ones in class_batch.py, see find_route() there).
+	def solve(self, mission_set):
+		import requests
+
+		with self.lock:
+			self.requests += 1
+
+		try:
+			self.check_request(mission_set)
+		except ValueError as error:
+			this_id = mission_set.get('id') if isinstance(mission_set, dict) else None
+			return self._error(this_id, error, 400)
+
+		this_id = mission_set.get('id')
+		maximum_allowed_time = min(float(mission_set.get('maximum_time', \
+								self.maximum_allowed_time)), self.maximum_allowed_time)
+		solver = mission_set.get('solver', self.solver)
+
+		key = self._key(mission_set, maximum_allowed_time, solver)
+		with self.lock:
+			result = self.results.get(key)
+			if result is not None:
+				self.results.move_to_end(key)
+				return dict(result, id = this_id, cached = True)
+
+		# The coordinates are looked up in this thread (mostly just in
+		# < self.coordinates >). The worker processes just search. A request
+		# with unknown systems is answered like any other broken request.
+		# But if EDSM can't be reached, the client shall know that it may
+		# try again later.
+		try:
+			datagrabber = RequestGrabber(mission_set, self)
+		except (cd.EDSMUnavailable, requests.RequestException) as error:
+			return self._error(this_id, error, 503)
+		except cd.EDSMError as error:
+			return self._error(this_id, error, 400)
+		except Exception as error:
+			return self._error(this_id, error, 500)
+
+		result = self.pool.apply(cb.find_route, (datagrabber, maximum_allowed_time, \
+																	solver, this_id))
+
+		if 'error' not in result:
+			with self.lock:
+				self.results[key] = result
+				self.results.move_to_end(key)
+				if len(self.results) > self.maximum_results:
+					self.results.popitem(last = False)
+
+		return result
+
+
+	# This method returns some numbers about the daemon.
+	def status(self):
+		status = {}
+		status['workers'] = self.workers
+		status['requests'] = self.requests
+		status['known_systems'] = len(self.coordinates)
+		status['known_results'] = len(self.results)
+
+		return status
+
+
+	# This method listens for requests on < host >:< port > until the program
+	# is stopped.
+	def serve(self, host = '127.0.0.1', port = 8642):
+		server = ThreadingHTTPServer((host, port), RequestHandler)
+		server.solver_daemon = self
+
+		try:
+			server.serve_forever()
+		finally:
+			server.server_close()
+			self.pool.terminate()
+
+
+	# This method returns the result for a request with the id < this_id >
+	# that failed because of < error >. < status > is the HTTP status code
+	# it shall be answered with.
+	def _error(self, this_id, error, status):
+		error = '{}: {}'.format(type(error).__name__, error)
+
+		return {'id': this_id, 'error': error, 'status': status}
+
+
+	# This method returns a string that is the same for the same missions,
+	# time and solver.
+	def _key(self, mission_set, maximum_allowed_time, solver):
+		content = [mission_set['origin'], mission_set['travelers'], \
+											maximum_allowed_time, solver]
+
+		return json.dumps(content)
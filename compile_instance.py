@@ -0,0 +1,51 @@
+#    "compile_instance" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This program reads a mission file, looks up the coordinates of all systems
+# (in the cache, in a galaxy index or at EDSM), calculates all distances and
+# writes everything into an instance file. visitor_mission_optimizer.py
+# (see its option --instance) and batch_optimizer.py can start the search
+# for a route right away with this file.
+#
+# See class_instancefile.py for details.
+
+
+import class_datagrabber as cd
+import class_instancefile as cif
+import additional_functions as ad
+
+if __name__ == '__main__':
+	args = ad.get_compile_args()
+
+	# The file in which the coordinates of the systems are stored to not
+	# fetch them again from EDSM on the next run. None if the user doesn't
+	# want that.
+	cache_file = None if args.no_cache else args.cache
+
+	try:
+		datagrabber = cd.DataGrabber(args.infile, cache_file, galaxy_index = args.galaxy_index)
+	except cd.EDSMError as error:
+		print("\n" + str(error))
+		exit(1)
+
+	content_hash = cif.compile_instance(datagrabber, args.instance_file)
+
+	this = "Done. {} systems written to {} ".format(len(datagrabber.system_names), \
+																args.instance_file)
+	that = "(hash: {}).".format(content_hash)
+	print(this + that)
@@ -0,0 +1,46 @@
+#    "solver_daemon" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This program keeps running in the background and answers requests for 
+# routes via HTTP. Since the coordinates of all systems it has seen and all 
+# routes it has found are kept in memory, the answers come MUCH faster than 
+# from visitor_mission_optimizer.py (which needs to start up, read the cache 
+# etc. each time).
+# 
+# See class_solverdaemon.py for details.
+
+
+import class_solverdaemon as csd
+import additional_functions as ad
+
+if __name__ == '__main__':
+	args = ad.get_daemon_args()
+
+	# The file in which the coordinates of the systems are stored to not
+	# fetch them again from EDSM. None if the user doesn't want that.
+	cache_file = None if args.no_cache else args.cache
+
+	daemon = csd.SolverDaemon(args.maximum_time, args.workers, args.solver, \
+									cache_file, galaxy_index = args.galaxy_index)
+
+	print("Listening on http://{}:{}/solve ...".format(args.host, args.port))
+
+	try:
+		daemon.serve(args.host, args.port)
+	except KeyboardInterrupt:
+		print("\nStopped.")
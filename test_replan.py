@@ -0,0 +1,102 @@
+#    "test_replan" (v1.0)
+#    Copyright 2019 Soren Heinze
+#    soerenheinze (at) gmx (dot) de
+#    5B1C 1897 560A EF50 F1EB 2579 2297 FAE4 D9B5 2A35
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# This file contains the tests for replan() of class Routefinder. Run them
+# with "python3 -m unittest test_replan" (or with pytest).
+
+
+from contextlib import redirect_stdout
+import unittest
+import os
+
+import class_missiongenerator as cm
+import class_routefinder as cr
+
+
+# This class makes up missions like class MissionGenerator, except that the
+# travelers are given. The coordinates of the systems are still made up.
+class GivenMissions(cm.MissionGenerator):
+	# < origin > and < travelers > are like in class DataGrabber. See class
+	# MissionGenerator for < seed >.
+	def __init__(self, seed, origin, travelers):
+		self.given_origin = origin
+		self.given_travelers = travelers
+
+		cm.MissionGenerator.__init__(self, seed, len(travelers), (1, 1), 0)
+
+
+	def _get_missions(self):
+		self.origin = self.given_origin
+		self.travelers = [list(x) for x in self.given_travelers]
+
+
+# This function returns the result of < function > called with < args >
+# and < kwargs > without printing anything.
+def quietly(function, *args, **kwargs):
+	with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+		return function(*args, **kwargs)
+
+
+class TestReplan(unittest.TestCase):
+	def setUp(self):
+		datagrabber = quietly(cm.MissionGenerator, 1, 4, (1, 3), 10)
+		self.routefinder = quietly(cr.Routefinder, datagrabber, 5)
+		self.datagrabber = datagrabber
+
+
+	# The first destination of the route is the only destination of one
+	# traveler. After flying there this traveler is finished and thus no
+	# longer in the missions.
+	def test_position_no_longer_in_missions(self):
+		position = self.routefinder.record_path[1]
+		remaining = [x for x in self.datagrabber.travelers if x != [position]]
+		self.assertEqual(len(remaining), len(self.datagrabber.travelers) - 1)
+
+		datagrabber = quietly(GivenMissions, 1, self.datagrabber.origin, remaining)
+		self.assertNotIn(position, datagrabber.system_ids)
+
+		replanned = quietly(self.routefinder.replan, datagrabber, position, 5)
+
+		self.assertIn(position, datagrabber.system_ids)
+		self.assertEqual(datagrabber.distance_matrix.shape, \
+								(len(datagrabber.system_names), ) * 2)
+		self.assertEqual(replanned.record_path[0], position)
+		self.assertEqual(replanned.record_path[-1], datagrabber.origin)
+
+		# All remaining destinations are visited in the correct order.
+		for traveler in remaining:
+			visited = 0
+			for name in replanned.record_path:
+				if visited < len(traveler) and traveler[visited] == name:
+					visited += 1
+			self.assertEqual(visited, len(traveler))
+
+
+	# The position is still a destination of another traveler.
+	def test_position_still_in_missions(self):
+		position = self.routefinder.record_path[2]
+		number_of_systems = len(self.datagrabber.system_names)
+
+		replanned = quietly(self.routefinder.replan, self.datagrabber, position, 5)
+
+		self.assertEqual(len(self.datagrabber.system_names), number_of_systems)
+		self.assertEqual(replanned.record_path[0], position)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -25,9 +25,11 @@
 # This makes it difficult optimizing if several visitor missions are taken upon.
 # Hence, the existance of this sprogram.
 # 
-# If 14 or less destinations need to be visited the exact solution is 
-# calculated. The number 14 includes start and endpoint as two different 
-# locations; even though it is the same. This takes approx. 1 minute.
+# If 16 or less destinations need to be visited the exact solution is 
+# calculated. The number 16 includes start and endpoint as two different 
+# locations; even though it is the same. This takes usually a few seconds.
+# For not too many travelers the exact solution is calculated for even more 
+# destinations (see _do_all() in class_routefinder.py).
 # 
 # Since the number of solutions grows factorial means adding just one more 
 # destination, that the program needs an impractical amount of time to 
@@ -41,7 +43,9 @@
 
 
 import class_datagrabber as cd
+import class_instancefile as cif
 import class_routefinder as cr
+import class_checkpoint as cc
 import additional_functions as ad
 
 if __name__ == '__main__':
@@ -51,22 +55,78 @@ if __name__ == '__main__':
 	# ""000_missions.txt" as filename.
 	infile = args.infile
 
+	# The file in which the coordinates of the systems are stored to not
+	# fetch them again from EDSM on the next run. None if the user doesn't
+	# want that.
+	cache_file = None if args.no_cache else args.cache
+
+	# The file in which the routes are stored that were found. None if the 
+	# user doesn't want that.
+	result_cache_file = None if args.no_cache else args.result_cache
+
+	# The file in which the coordinates are looked up instead of fetching 
+	# them from EDSM. None if they shall be fetched from EDSM.
+	galaxy_index = args.galaxy_index
+
 	# The maximum time the program is allowed to search for a route. Default 
 	# is 123 seconds.
 	maximum_allowed_time = args.maximum_time
 
+	# The number of processes the search is split over. Default is 1.
+	workers = args.workers
+
+	# The method used to find a route. Default is 'auto'.
+	solver = args.solver
+
+	# The number of partial routes of the beam search. Default is 1000.
+	beam_width = args.beam_width
+
+	# The number of routes of the genetic algorithm. Default is 200.
+	population_size = args.population
+
+	# The search stops if the best route is at most this much longer than the 
+	# shortest route. Default is None (search until the time is used up).
+	gap = args.gap
+
 	# Fetch the mission information and data necessary to calculate the length
 	# of a route.
-	datagrabber = cd.DataGrabber(infile)
+	# If there is an instance file (see compile_instance.py), everything is 
+	# taken from there.
+	try:
+		if args.instance is not None:
+			datagrabber = cif.InstanceFile(args.instance)
+		else:
+			datagrabber = cd.DataGrabber(infile, cache_file, galaxy_index = galaxy_index)
+	except (cd.EDSMError, ValueError) as error:
+		print("\n" + str(error))
+		exit(1)
+
+	# The state of the search is written to this file from time to time (and 
+	# maybe read from it to continue an earlier search). None if the user 
+	# doesn't want that.
+	checkpoint = None
+	if args.checkpoint is not None:
+		checkpoint = cc.Checkpoint(args.checkpoint, args.checkpoint_interval, args.resume)
 
 	# Find a suitable route with the data gathered above.
-	routefinder = cr.Routefinder(datagrabber, maximum_allowed_time)
+	routefinder = cr.Routefinder(datagrabber, maximum_allowed_time, workers, solver, \
+					checkpoint = checkpoint, result_cache_file = result_cache_file, \
+					beam_width = beam_width, population_size = population_size, \
+					gap = gap)
 
 	print("\nThis is the best route that could be found.")
 	print("Route:", routefinder.record_path)
 	# Stating the precision automatically rounds.
 	print("Total distance: {0:.2f} ly\n".format(routefinder.record_length))
 
+	if not routefinder.optimal and routefinder.gap() is not None:
+		this = "It is at most {0:.1f} % longer ".format(100 * routefinder.gap())
+		that = "than the shortest route.\n"
+		print(this + that)
+
+	if args.stats_out is not None:
+		routefinder.stats.write_json(args.stats_out)
+
 
 
 